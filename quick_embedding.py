@@ -9,33 +9,28 @@ if sys.platform == 'win32':
     import io
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
-from search import ElasticsearchSetup
+from search import get_shared_setup
 
 # Get password from command line or prompt
 password = sys.argv[1] if len(sys.argv) > 1 else None
 doc_id = sys.argv[2] if len(sys.argv) > 2 else None
 
-es = ElasticsearchSetup(password=password)
+es = get_shared_setup(password=password)
 es_client = es.get_client()
 
-# Try to get a document ID first if not provided
-if not doc_id:
-    # Get first document ID
-    result = es_client.search(index='government_documents', query={'match_all': {}}, size=1, _source=['doc_id', 'title'])
-    if result['hits']['hits']:
-        doc_id = result['hits']['hits'][0]['_source'].get('doc_id')
-        print(f"Using first document: {doc_id}")
-    else:
-        print("[ERROR] No documents found in index!")
-        sys.exit(1)
-
-# Get document directly by doc_id using term query - get first chunk
+# Get a chunk of the requested document (or of the first document) in one
+# search, fetching only the fields shown below
 result = es_client.search(
     index='government_documents', 
-    query={'term': {'doc_id': doc_id}}, 
+    query={'term': {'doc_id': doc_id}} if doc_id else {'match_all': {}}, 
     size=1,
-    source_includes=['doc_id', 'title', 'chunk_id', 'embedding', 'text_chunk']
+    source_includes=['doc_id', 'title', 'chunk_id', 'embedding']
 )
+if not doc_id:
+    if not result['hits']['hits']:
+        print("[ERROR] No documents found in index!")
+        sys.exit(1)
+    print(f"Using first document: {result['hits']['hits'][0]['_source'].get('doc_id')}")
 
 if result['hits']['hits']:
     hit = result['hits']['hits'][0]
@@ -5,6 +5,7 @@ Flask web application for government document search.
 
 import os
 import sys
+import heapq
 from pathlib import Path
 from flask import Flask, render_template, request, jsonify, send_file, abort
 from typing import Optional, List, Dict
@@ -12,7 +13,7 @@ from typing import Optional, List, Dict
 # Add src to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from search.es_setup import ElasticsearchSetup
+from search.es_setup import get_shared_setup
 from search.search_service import SearchService
 from embeddings.embedding_service import EmbeddingService
 from summarization.summarizer import DocumentSummarizer
@@ -38,7 +39,7 @@ def get_search_service():
         es_username = os.getenv('ES_USERNAME', None)
         es_password = os.getenv('ES_PASSWORD', None)
         
-        _es_setup = ElasticsearchSetup(
+        _es_setup = get_shared_setup(
             host=es_host,
             port=es_port,
             username=es_username,
@@ -120,13 +121,8 @@ def search():
                 section=filters.get('section')
             )
         else:  # both
-            semantic_results = search_service.search(
-                query=query,
-                size=size,
-                source=filters.get('source'),
-                section=filters.get('section')
-            )
-            keyword_results = search_service.keyword_search(
+            # Both queries go to Elasticsearch in one _msearch request
+            semantic_results, keyword_results = search_service.search_both(
                 query=query,
                 size=size,
                 source=filters.get('source'),
@@ -215,22 +211,18 @@ def format_results(results: List[Dict], deduplicate: bool, max_size: int) -> Lis
     
     # Deduplicate if requested
     if deduplicate:
-        from collections import defaultdict
-        doc_results = defaultdict(list)
-        
+        # One pass keeping each document's best chunk (the first one on ties)
+        best = {}
         for result in results:
             doc_id = result.get('doc_id', '')
-            doc_results[doc_id].append(result)
-        
-        # Keep best chunk per document
-        deduplicated = []
-        for doc_id, chunks in doc_results.items():
-            sorted_chunks = sorted(chunks, key=lambda x: x.get('score', 0), reverse=True)
-            deduplicated.append(sorted_chunks[0])
-        
-        # Re-sort and limit
-        deduplicated.sort(key=lambda x: x.get('score', 0), reverse=True)
-        results = deduplicated[:max_size]
+            score = result.get('score', 0)
+            current = best.get(doc_id)
+            if current is None or score > current[0]:
+                best[doc_id] = (score, result)
+        
+        # Top max_size documents by score, without sorting the rest
+        results = heapq.nlargest(max_size, (result for _, result in best.values()),
+                                 key=lambda x: x.get('score', 0))
     
     # Format for JSON response
     formatted = []
@@ -244,12 +236,17 @@ def format_results(results: List[Dict], deduplicate: bool, max_size: int) -> Lis
             'score': result.get('score', 0),
             'raw_score': result.get('score', 0),  # Keep original score
             'text_chunk': result.get('text_chunk', ''),
+            # Passages matching the query; summaries are built from these when present
+            'highlights': result.get('highlights', []),
             'page': result.get('page', None),
             'filename': result.get('filename', ''),
             'filepath': result.get('filepath', ''),
             'is_scanned': result.get('is_scanned', False),
             'num_pages': result.get('num_pages', 0)
         })
+        # Summary stored at index time; the summarizer leaves it as is
+        if result.get('summary'):
+            formatted[-1]['summary'] = result['summary']
     
     return formatted
 
@@ -378,7 +375,9 @@ def serve_pdf_by_doc_id():
         response = es_client.search(
             index='government_documents',
             query=query,
-            size=1
+            size=1,
+            # Only the path is needed, not the chunk text and embedding
+            source_includes=['filepath']
         )
         
         if not response['hits']['hits']:
@@ -457,7 +456,8 @@ def summarize():
         search_service = get_search_service()
         es_client = search_service.es_setup.get_client()
         
-        # Find document by doc_id
+        # The summary is chosen from the document's leading sentences, so only
+        # the first chunks are fetched, in order, to rebuild that much text
         query_es = {
             "bool": {
                 "must": [
@@ -469,14 +469,21 @@ def summarize():
         response = es_client.search(
             index='government_documents',
             query=query_es,
-            size=1
+            size=DocumentSummarizer.leading_chunk_count(num_sentences),
+            sort=[{"chunk_id": "asc"}],
+            source_includes=['text_chunk', 'title']
         )
         
-        if not response['hits']['hits']:
+        hits = response['hits']['hits']
+        if not hits:
             return jsonify({'error': 'Document not found'}), 404
         
-        hit = response['hits']['hits'][0]
-        document = hit['_source']
+        document = {
+            'title': hits[0]['_source'].get('title', 'Unknown'),
+            'text_chunk': DocumentSummarizer.join_chunks(
+                [hit['_source'].get('text_chunk', '') for hit in hits]
+            )
+        }
         
         # Generate summary
         summarizer = get_summarizer()
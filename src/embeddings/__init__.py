@@ -1,5 +1,3 @@
-from .embedding_service import EmbeddingService
-
-__all__ = ['EmbeddingService']
-
+from .embedding_service import EmbeddingService, quantize_embeddings, dequantize_embedding
 
+__all__ = ['EmbeddingService', 'quantize_embeddings', 'dequantize_embedding']
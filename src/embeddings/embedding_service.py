@@ -3,8 +3,10 @@ Embedding service for generating semantic embeddings from text.
 Uses sentence-transformers for fast and efficient embeddings.
 """
 
+import base64
 import logging
-from typing import List, Union
+from functools import lru_cache
+from typing import List, Tuple, Union
 import numpy as np
 
 logger = logging.getLogger(__name__)
@@ -17,8 +19,44 @@ except ImportError:
     logger.error("sentence-transformers not available. Install it for embeddings.")
 
 
+@lru_cache(maxsize=4)
+def _load_model(model_name: str):
+    """Load a sentence transformer once per process; later services reuse it."""
+    logger.info(f"Loading embedding model: {model_name}")
+    return SentenceTransformer(model_name)
+
+
+def quantize_embeddings(embeddings) -> List[Tuple[str, float]]:
+    """
+    Pack embeddings as base64 int8 bytes with one scale per vector.
+    
+    Args:
+        embeddings: 2-D array (or list of vectors)
+        
+    Returns:
+        (base64 string, scale) per vector; dequantize_embedding reverses it
+    """
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    scales = np.abs(matrix).max(axis=1) / 127.0
+    # All-zero rows (empty chunks) would divide by zero
+    scales[scales == 0] = 1.0
+    quantized = np.round(matrix / scales[:, None]).astype(np.int8)
+    return [(base64.b64encode(row.tobytes()).decode('ascii'), float(scale))
+            for row, scale in zip(quantized, scales)]
+
+
+def dequantize_embedding(data: str, scale: float) -> np.ndarray:
+    """Decode one vector from quantize_embeddings into a float32 array."""
+    return np.frombuffer(base64.b64decode(data), dtype=np.int8).astype(np.float32) * np.float32(scale)
+
+
 class EmbeddingService:
-    """Service for generating semantic embeddings from text."""
+    """
+    Service for generating semantic embeddings from text.
+    
+    Embeddings are normalized to unit length (as DocumentSummarizer's are), so
+    cosine similarity between them is a plain dot product.
+    """
     
     def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
         """
@@ -34,8 +72,7 @@ class EmbeddingService:
         if not SENTENCE_TRANSFORMERS_AVAILABLE:
             raise ImportError("sentence-transformers is required for embeddings. Install it first.")
         
-        logger.info(f"Loading embedding model: {model_name}")
-        self.model = SentenceTransformer(model_name)
+        self.model = _load_model(model_name)
         self.model_name = model_name
         self.embedding_dim = self.model.get_sentence_embedding_dimension()
         logger.info(f"Model loaded. Embedding dimension: {self.embedding_dim}")
@@ -54,11 +91,13 @@ class EmbeddingService:
             # Return zero vector for empty text
             return [0.0] * self.embedding_dim
         
-        embedding = self.model.encode(text, convert_to_numpy=True, show_progress_bar=False)
+        embedding = self.model.encode(text, convert_to_numpy=True, show_progress_bar=False,
+                                      normalize_embeddings=True)
         return embedding.tolist()
     
     def generate_embeddings_batch(self, texts: List[str], batch_size: int = 32, 
-                                   show_progress: bool = False) -> List[List[float]]:
+                                   show_progress: bool = False,
+                                   as_numpy: bool = False) -> Union[List[List[float]], np.ndarray]:
         """
         Generate embeddings for a batch of texts (more efficient).
         
@@ -66,12 +105,14 @@ class EmbeddingService:
             texts: List of input texts
             batch_size: Batch size for processing
             show_progress: Whether to show progress bar
+            as_numpy: Return a float32 array of shape (len(texts), dim) instead of
+                      lists, skipping the per-vector tolist() conversion
             
         Returns:
-            List of embedding vectors
+            List of embedding vectors, or a 2-D numpy array if as_numpy is set
         """
         if not texts:
-            return []
+            return np.zeros((0, self.embedding_dim), dtype=np.float32) if as_numpy else []
         
         # Filter out empty texts and remember indices
         non_empty_indices = []
@@ -84,6 +125,8 @@ class EmbeddingService:
         
         if not non_empty_texts:
             # All texts are empty, return zero vectors
+            if as_numpy:
+                return np.zeros((len(texts), self.embedding_dim), dtype=np.float32)
             return [[0.0] * self.embedding_dim] * len(texts)
         
         # Generate embeddings for non-empty texts
@@ -91,9 +134,16 @@ class EmbeddingService:
             non_empty_texts,
             batch_size=batch_size,
             convert_to_numpy=True,
-            show_progress_bar=show_progress
+            show_progress_bar=show_progress,
+            normalize_embeddings=True
         )
         
+        if as_numpy:
+            # Empty texts keep a zero row
+            result = np.zeros((len(texts), self.embedding_dim), dtype=np.float32)
+            result[non_empty_indices] = embeddings
+            return result
+        
         # Map back to original indices
         result = []
         embedding_idx = 0
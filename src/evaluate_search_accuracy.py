@@ -15,7 +15,7 @@ from collections import defaultdict
 # Add src to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from search.es_setup import ElasticsearchSetup
+from search.es_setup import get_shared_setup
 from search.search_service import SearchService
 from embeddings.embedding_service import EmbeddingService
 from evaluation.metrics import (
@@ -238,7 +238,7 @@ def main():
     # Initialize services
     logger.info("\nInitializing search services...")
     try:
-        es_setup = ElasticsearchSetup(
+        es_setup = get_shared_setup(
             host=args.es_host,
             port=args.es_port,
             username=args.es_username,
@@ -20,7 +20,7 @@ if sys.platform == 'win32':
 # Add src to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from search.es_setup import ElasticsearchSetup
+from search.es_setup import ElasticsearchSetup, get_shared_setup
 from processors.pdf_processor import PDFProcessor
 
 # Setup logging
@@ -48,7 +48,8 @@ def find_doc_id_by_filename(filename: str, es_setup: ElasticsearchSetup, index_n
         response = es_client.search(
             index=index_name,
             query=query,
-            size=10
+            size=10,
+            source_includes=['doc_id', 'filename', 'title', 'source', 'filepath']
         )
         
         results = []
@@ -103,7 +104,7 @@ def main():
     
     # Initialize Elasticsearch
     try:
-        es_setup = ElasticsearchSetup(
+        es_setup = get_shared_setup(
             host=args.es_host,
             port=args.es_port,
             username=args.es_username,
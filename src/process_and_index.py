@@ -13,15 +13,18 @@ import json
 import argparse
 import logging
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 from tqdm import tqdm
 
 # Add src to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from processors import PDFProcessor
-from embeddings import EmbeddingService
+from embeddings import EmbeddingService, quantize_embeddings
 from search import ElasticsearchSetup
+from search.es_setup import FAST_SERIALIZERS
+from search.faiss_backend import export_faiss_index
+from summarization import DocumentSummarizer
 
 # Setup logging
 logging.basicConfig(
@@ -66,7 +69,9 @@ def index_documents(documents: List[Dict],
                    embedding_service: EmbeddingService,
                    es_setup: ElasticsearchSetup,
                    index_name: str,
-                   batch_size: int = 32):
+                   batch_size: int = 32,
+                   summarizer: Optional[DocumentSummarizer] = None,
+                   store_quantized: bool = False):
     """
     Generate embeddings and index documents into Elasticsearch.
     
@@ -76,62 +81,91 @@ def index_documents(documents: List[Dict],
         es_setup: ElasticsearchSetup instance
         index_name: Name of the Elasticsearch index
         batch_size: Batch size for embedding generation
+        summarizer: If given, each chunk is stored with a precomputed
+            'summary' (and the 'summary_model' that made it), so searches
+            can show it without summarizing at query time
+        store_quantized: Also store each embedding as base64 int8 bytes
+            ('embedding_q') with its 'embedding_scale', a quarter-size copy
+            for tools that only display vectors
     """
     logger.info(f"Indexing {len(documents)} documents...")
     
     total_chunks = sum(len(doc.get('text_chunks', [])) for doc in documents)
     logger.info(f"Total chunks to index: {total_chunks}")
     
-    indexed_count = 0
     failed_count = 0
     
-    # Process documents in batches
-    for doc in tqdm(documents, desc="Processing documents"):
-        try:
-            text_chunks = doc.get('text_chunks', [])
-            
-            if not text_chunks:
-                logger.warning(f"No chunks found in document: {doc.get('title', 'Unknown')}")
+    def iter_es_documents():
+        """Embed each document's chunks and yield them one ES document per chunk."""
+        nonlocal failed_count
+        for doc in tqdm(documents, desc="Processing documents"):
+            try:
+                text_chunks = doc.get('text_chunks', [])
+                
+                if not text_chunks:
+                    logger.warning(f"No chunks found in document: {doc.get('title', 'Unknown')}")
+                    continue
+                
+                # Generate embeddings for all chunks in this document
+                chunk_texts = [chunk['text'] for chunk in text_chunks]
+                # Rows stay numpy arrays when orjson encodes them directly; the
+                # stock client serializer cannot handle them under NumPy 2
+                embeddings = embedding_service.generate_embeddings_batch(
+                    chunk_texts,
+                    batch_size=batch_size,
+                    show_progress=False,
+                    as_numpy=bool(FAST_SERIALIZERS)
+                )
+                
+                # Summaries for all of this document's chunks in one model call
+                if summarizer is not None:
+                    summaries = [
+                        result['summary'] for result in summarizer.summarize_search_results(
+                            [{'text_chunk': text} for text in chunk_texts],
+                            num_sentences_per_doc=2
+                        )
+                    ]
+                else:
+                    summaries = None
+                
+                quantized = quantize_embeddings(embeddings) if store_quantized else None
+                
+                # Prepare documents for indexing (one per chunk)
+                es_documents = []
+                for i, (chunk, embedding) in enumerate(zip(text_chunks, embeddings)):
+                    es_doc = {
+                        'doc_id': doc['doc_id'],
+                        'title': doc['title'],
+                        'source': doc['source'],
+                        'date': doc.get('date'),
+                        'section': doc.get('section', 'Document'),
+                        'chunk_id': chunk['chunk_id'],
+                        'text_chunk': chunk['text'],
+                        'page': chunk.get('page'),
+                        'embedding': embedding,
+                        'filename': doc['filename'],
+                        'filepath': doc['filepath'],
+                        'is_scanned': doc.get('is_scanned', False),
+                        'num_pages': doc.get('num_pages', 0)
+                    }
+                    if summaries is not None:
+                        es_doc['summary'] = summaries[i]
+                        es_doc['summary_model'] = summarizer.model_name
+                    if quantized is not None:
+                        es_doc['embedding_q'], es_doc['embedding_scale'] = quantized[i]
+                    es_documents.append(es_doc)
+                    
+            except Exception as e:
+                logger.error(f"Failed to index document {doc.get('title', 'Unknown')}: {e}", exc_info=True)
+                failed_count += len(doc.get('text_chunks', []))
                 continue
             
-            # Generate embeddings for all chunks in this document
-            chunk_texts = [chunk['text'] for chunk in text_chunks]
-            embeddings = embedding_service.generate_embeddings_batch(
-                chunk_texts,
-                batch_size=batch_size,
-                show_progress=False
-            )
-            
-            # Prepare documents for indexing (one per chunk)
-            es_documents = []
-            for chunk, embedding in zip(text_chunks, embeddings):
-                es_doc = {
-                    'doc_id': doc['doc_id'],
-                    'title': doc['title'],
-                    'source': doc['source'],
-                    'date': doc.get('date'),
-                    'section': doc.get('section', 'Document'),
-                    'chunk_id': chunk['chunk_id'],
-                    'text_chunk': chunk['text'],
-                    'page': chunk.get('page'),
-                    'embedding': embedding,
-                    'full_text': doc.get('full_text', ''),
-                    'filename': doc['filename'],
-                    'filepath': doc['filepath'],
-                    'is_scanned': doc.get('is_scanned', False),
-                    'num_pages': doc.get('num_pages', 0)
-                }
-                es_documents.append(es_doc)
-            
-            # Bulk index chunks for this document
-            if es_setup.bulk_index(index_name, es_documents):
-                indexed_count += len(es_documents)
-            else:
-                failed_count += len(es_documents)
-                
-        except Exception as e:
-            logger.error(f"Failed to index document {doc.get('title', 'Unknown')}: {e}", exc_info=True)
-            failed_count += len(doc.get('text_chunks', []))
+            yield from es_documents
+    
+    # Chunks from all documents stream into parallel bulk requests, so
+    # embedding the next document overlaps with sending the previous ones
+    indexed_count, bulk_failed = es_setup.stream_bulk_index(index_name, iter_es_documents())
+    failed_count += bulk_failed
     
     logger.info("="*80)
     logger.info("INDEXING SUMMARY")
@@ -155,6 +189,9 @@ Examples:
   
   # Process PDFs first, then index
   python src/process_and_index.py --download-dir downloads --processed-dir data/processed
+  
+  # Rebuild the index with full-precision HNSW vectors
+  python src/process_and_index.py --delete-existing --vector-index-type hnsw
         """
     )
     
@@ -220,6 +257,46 @@ Examples:
         help='Delete existing index if it exists'
     )
     
+    parser.add_argument(
+        '--vector-index-type',
+        type=str,
+        choices=['int8_hnsw', 'int4_hnsw', 'hnsw', 'default'],
+        default='int8_hnsw',
+        help='HNSW variant for the embedding field when creating the index; quantized '
+             'types store vectors compactly for faster kNN, "default" leaves it to the '
+             'server (default: int8_hnsw)'
+    )
+    
+    parser.add_argument(
+        '--precompute-summaries',
+        action='store_true',
+        help='Store an extractive summary with each chunk so searches need not '
+             'summarize at query time (slower indexing; reindex when the model changes)'
+    )
+    
+    parser.add_argument(
+        '--store-quantized',
+        action='store_true',
+        help='Also store an int8 copy of each embedding (embedding_q), which '
+             'view_embedding_fast.py reads instead of the float vector'
+    )
+    
+    parser.add_argument(
+        '--export-faiss',
+        type=str,
+        default=None,
+        metavar='DIR',
+        help='After indexing, copy the index\'s embeddings into a local FAISS index '
+             'in DIR for search_documents.py --backend faiss (needs faiss-cpu)'
+    )
+    
+    parser.add_argument(
+        '--ocr',
+        action='store_true',
+        help='With --download-dir, OCR scanned pages that have no text layer '
+             '(slow; needs pytesseract and tesseract)'
+    )
+    
     parser.add_argument(
         '--batch-size',
         type=int,
@@ -236,7 +313,8 @@ Examples:
         process_all_pdfs(
             download_dir=args.download_dir,
             output_dir=args.processed_dir,
-            skip_existing=True
+            skip_existing=True,
+            ocr=args.ocr
         )
     
     # Load processed documents
@@ -265,19 +343,38 @@ Examples:
     es_setup.create_index(
         index_name=args.index_name,
         embedding_dim=embedding_dim,
-        delete_existing=args.delete_existing
+        delete_existing=args.delete_existing,
+        vector_index_type=None if args.vector_index_type == 'default' else args.vector_index_type
     )
     
-    # Index documents
-    index_documents(
-        documents=documents,
-        embedding_service=embedding_service,
-        es_setup=es_setup,
-        index_name=args.index_name,
-        batch_size=args.batch_size
-    )
+    summarizer = None
+    if args.precompute_summaries:
+        logger.info("Chunk summaries will be precomputed")
+        # Same model and settings as the web app's summarizer
+        summarizer = DocumentSummarizer()
+    
+    # Index documents with refresh disabled; always restore settings afterwards
+    es_setup.begin_bulk(args.index_name)
+    try:
+        index_documents(
+            documents=documents,
+            embedding_service=embedding_service,
+            es_setup=es_setup,
+            index_name=args.index_name,
+            batch_size=args.batch_size,
+            summarizer=summarizer,
+            store_quantized=args.store_quantized
+        )
+    finally:
+        es_setup.end_bulk(args.index_name)
     
     logger.info("Indexing completed successfully!")
+    
+    if args.export_faiss:
+        # Elasticsearch stays the source of truth; the export is read from it
+        es_setup.es.indices.refresh(index=args.index_name)
+        logger.info(f"Exporting FAISS index to {args.export_faiss}")
+        export_faiss_index(es_setup, args.index_name, args.export_faiss)
 
 
 if __name__ == "__main__":
@@ -45,7 +45,8 @@ def process_all_pdfs(download_dir: str = "downloads",
                      output_dir: str = "data/processed",
                      chunk_size: int = 500,
                      chunk_overlap: int = 100,
-                     skip_existing: bool = True):
+                     skip_existing: bool = True,
+                     ocr: bool = False):
     """
     Process all PDFs in the download directory.
     
@@ -55,13 +56,14 @@ def process_all_pdfs(download_dir: str = "downloads",
         chunk_size: Number of words per chunk
         chunk_overlap: Number of words to overlap between chunks
         skip_existing: Skip already processed files
+        ocr: OCR pages that have no text layer
     """
     # Create output directory
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
     
     # Initialize processor
-    processor = PDFProcessor(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    processor = PDFProcessor(chunk_size=chunk_size, chunk_overlap=chunk_overlap, ocr=ocr)
     
     # Find all PDF files
     pdf_files = find_pdf_files(download_dir)
@@ -159,6 +161,12 @@ def main():
         help='Re-process already processed files'
     )
     
+    parser.add_argument(
+        '--ocr',
+        action='store_true',
+        help='OCR scanned pages that have no text layer (slow; needs pytesseract and tesseract)'
+    )
+    
     args = parser.parse_args()
     
     process_all_pdfs(
@@ -166,7 +174,8 @@ def main():
         output_dir=args.output_dir,
         chunk_size=args.chunk_size,
         chunk_overlap=args.chunk_overlap,
-        skip_existing=not args.no_skip_existing
+        skip_existing=not args.no_skip_existing,
+        ocr=args.ocr
     )
 
 
@@ -6,46 +6,160 @@ Extracts text from PDFs, splits into chunks, and extracts metadata.
 import os
 import re
 import hashlib
+import importlib.util
 import json
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 import logging
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
+# Optional: JIT-compile the chunk boundary loop
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is not installed."""
+        def wrap(func):
+            return func
+        return wrap
+
+
+@njit(cache=True)
+def _chunk_bounds(breaks, word_starts, is_space, text_len, chunk_chars, overlap_chars, min_words):
+    """
+    Compute (start, end) character offsets of overlapping chunks.
+    
+    Works purely on the sorted array of space/newline offsets so it can be
+    compiled with numba; the caller does the string slicing.
+    
+    Args:
+        breaks: Sorted int64 array of whitespace offsets in the text
+        word_starts: Sorted int64 array of offsets where a word begins
+        is_space: Boolean array, True where the character is whitespace
+        text_len: Length of the text
+        chunk_chars: Target chunk size in characters
+        overlap_chars: Overlap between chunks in characters
+        min_words: Chunks with fewer words are extended to the next boundary
+        
+    Returns:
+        int64 array of shape (n, 2) with start/end offsets
+    """
+    num_breaks = len(breaks)
+    bounds = np.empty((text_len // max(chunk_chars - overlap_chars, 1) + 16, 2), dtype=np.int64)
+    count = 0
+    start = 0
+    
+    while start < text_len:
+        # Calculate end position
+        end = min(start + chunk_chars, text_len)
+        
+        # Adjust to word boundary if not at end: prefer the last break up to
+        # 200 chars back, else the next one up to 100 ahead
+        if end < text_len:
+            pos = np.searchsorted(breaks, end)
+            if pos > 0 and breaks[pos - 1] > max(start, end - 200):
+                end = breaks[pos - 1] + 1
+            elif pos < num_breaks and breaks[pos] < min(end + 100, text_len):
+                end = breaks[pos] + 1
+        
+        # Word count: word starts after the first character, plus the word the
+        # chunk opens on (an overlap may start mid-word), as len(chunk_text.split())
+        words = np.searchsorted(word_starts, end) - np.searchsorted(word_starts, start + 1)
+        if not is_space[start]:
+            words += 1
+        
+        # If chunk is too small, extend to the next boundary (all-whitespace
+        # chunks are dropped by the caller, so they are left as they are)
+        if 0 < words < min_words and end < text_len:
+            pos = np.searchsorted(breaks, end)
+            if pos < num_breaks and breaks[pos] < min(end + chunk_chars, text_len):
+                end = breaks[pos] + 1
+        
+        if count == len(bounds):
+            grown = np.empty((len(bounds) * 2, 2), dtype=np.int64)
+            grown[:count] = bounds
+            bounds = grown
+        bounds[count, 0] = start
+        bounds[count, 1] = end
+        count += 1
+        
+        # Move to next chunk with overlap
+        if end >= text_len:
+            break
+        
+        # Start the overlap at the first word boundary after overlap_start
+        overlap_start = max(start, end - overlap_chars)
+        if overlap_start < end:
+            pos = np.searchsorted(breaks, overlap_start)
+            if pos < num_breaks and breaks[pos] < min(overlap_start + 200, text_len, end):
+                start = breaks[pos] + 1
+            else:
+                # No break nearby, so overlap_start already sits inside a word
+                start = overlap_start
+        else:
+            start = end
+        
+        # Safety: prevent infinite loops
+        if start >= end:
+            start = end + 1
+            if start >= text_len:
+                break
+    
+    return bounds[:count]
+
 # Try PyMuPDF first (fastest)
 try:
     import fitz  # PyMuPDF
     FITZ_AVAILABLE = True
+    # Skip extra work on tiny glyphs; irrelevant for indexing
+    fitz.TOOLS.set_small_glyph_heights(True)
+    # Plain text blocks only: no image blocks, ligatures expanded for search
+    FITZ_TEXT_FLAGS = fitz.TEXTFLAGS_BLOCKS & ~fitz.TEXT_PRESERVE_IMAGES & ~fitz.TEXT_PRESERVE_LIGATURES
 except ImportError:
     FITZ_AVAILABLE = False
     logger.warning("PyMuPDF (fitz) not available. Falling back to pdfplumber.")
 
-# Fallback to pdfplumber
+# Fallback to pdfplumber - only imported when actually needed, since
+# pulling in pdfminer is slow and PyMuPDF handles almost every file
+PDFPLUMBER_AVAILABLE = importlib.util.find_spec('pdfplumber') is not None
+if not FITZ_AVAILABLE and not PDFPLUMBER_AVAILABLE:
+    logger.error("Neither PyMuPDF nor pdfplumber available! Install one of them.")
+
+# Optional OCR for scanned pages (rendered through PyMuPDF, no Poppler needed)
 try:
-    import pdfplumber
-    PDFPLUMBER_AVAILABLE = True
+    import pytesseract
+    from PIL import Image
+    OCR_AVAILABLE = True
 except ImportError:
-    PDFPLUMBER_AVAILABLE = False
-    if not FITZ_AVAILABLE:
-        logger.error("Neither PyMuPDF nor pdfplumber available! Install one of them.")
+    OCR_AVAILABLE = False
 
 
 class PDFProcessor:
     """Fast PDF processor for text extraction and chunking."""
     
-    def __init__(self, chunk_size: int = 500, chunk_overlap: int = 100):
+    def __init__(self, chunk_size: int = 500, chunk_overlap: int = 100, ocr: bool = False):
         """
         Initialize PDF processor.
         
         Args:
             chunk_size: Number of words per chunk
             chunk_overlap: Number of words to overlap between chunks
+            ocr: OCR pages without a text layer (slow; needs pytesseract,
+                Pillow, the tesseract binary and PyMuPDF)
         """
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.fitz_available = FITZ_AVAILABLE
         self.pdfplumber_available = PDFPLUMBER_AVAILABLE
+        self.ocr_available = ocr and OCR_AVAILABLE and FITZ_AVAILABLE
+        if ocr and not self.ocr_available:
+            logger.warning("OCR requested but pytesseract/Pillow or PyMuPDF is not installed; scanned pages will be skipped.")
         
         if not self.fitz_available and not self.pdfplumber_available:
             raise ImportError("No PDF library available. Install PyMuPDF or pdfplumber.")
@@ -55,7 +169,7 @@ class PDFProcessor:
         content = f"{filepath}_{os.path.getsize(filepath)}_{os.path.getmtime(filepath)}"
         return hashlib.md5(content.encode()).hexdigest()
     
-    def extract_text_fast(self, pdf_path: str) -> Tuple[str, int, str]:
+    def extract_text_fast(self, pdf_path: str) -> Tuple[List[Tuple[int, str]], int, str]:
         """
         Extract text using fastest available method.
         
@@ -63,45 +177,66 @@ class PDFProcessor:
             pdf_path: Path to PDF file
             
         Returns:
-            Tuple of (text, page_count, extraction_method)
+            Tuple of (pages, page_count, extraction_method) where pages is a
+            list of (page_number, text) tuples for pages that contain text
         """
         # Try PyMuPDF first (fastest)
         if self.fitz_available:
             try:
-                doc = fitz.open(pdf_path)
-                text_parts = []
-                page_count = len(doc)
-                
-                for page_num in range(page_count):
-                    page = doc[page_num]
-                    text = page.get_text()
-                    if text:
-                        text_parts.append(f"[Page {page_num + 1}]\n{text}\n")
-                
-                doc.close()
-                full_text = "\n".join(text_parts)
-                return full_text, page_count, 'fitz'
+                pages = []
+                with fitz.open(pdf_path, filetype="pdf") as doc:
+                    page_count = len(doc)
+                    for page_num, page in enumerate(doc, 1):
+                        # Blocks are (x0, y0, x1, y1, text, block_no, block_type); type 0 is text
+                        blocks = page.get_text("blocks", flags=FITZ_TEXT_FLAGS)
+                        text = "\n".join(block[4] for block in blocks if block[6] == 0)
+                        if not text.strip() and self.ocr_available:
+                            text = self._ocr_page(page)
+                        if text:
+                            pages.append((page_num, text))
+                return pages, page_count, 'fitz'
             except Exception as e:
                 logger.warning(f"Fitz extraction failed for {pdf_path}: {e}")
         
         # Fallback to pdfplumber
         if self.pdfplumber_available:
             try:
+                import pdfplumber
                 with pdfplumber.open(pdf_path) as pdf:
-                    text_parts = []
+                    pages = []
                     page_count = len(pdf.pages)
                     
                     for page_num, page in enumerate(pdf.pages, 1):
                         text = page.extract_text()
                         if text:
-                            text_parts.append(f"[Page {page_num}]\n{text}\n")
+                            pages.append((page_num, text))
                     
-                    full_text = "\n".join(text_parts)
-                    return full_text, page_count, 'pdfplumber'
+                    return pages, page_count, 'pdfplumber'
             except Exception as e:
                 logger.error(f"pdfplumber extraction failed for {pdf_path}: {e}")
         
-        return "", 0, 'none'
+        return [], 0, 'none'
+    
+    def _ocr_page(self, page) -> str:
+        """
+        OCR a single page that has no text layer.
+        
+        Renders the page from the already-open document, one page at a time,
+        so memory stays bounded by a single raster.
+        
+        Args:
+            page: fitz.Page to OCR
+            
+        Returns:
+            Recognised text, or empty string on failure
+        """
+        try:
+            pix = page.get_pixmap(dpi=200, colorspace=fitz.csRGB, alpha=False)
+            image = Image.frombytes('RGB', (pix.width, pix.height), pix.samples)
+            return pytesseract.image_to_string(image)
+        except Exception as e:
+            logger.warning(f"OCR failed for page {page.number + 1}: {e}")
+            return ""
     
     def clean_text(self, text: str) -> str:
         """Clean extracted text - minimal processing for speed."""
@@ -114,22 +249,28 @@ class PDFProcessor:
         text = re.sub(r'\n{3,}', '\n\n', text)
         return text.strip()
     
-    def split_into_chunks(self, text: str) -> List[Dict[str, any]]:
+    def split_into_chunks(self, pages: List[Tuple[int, str]]) -> List[Dict[str, any]]:
         """
         Split text into chunks with overlap - optimized for large documents.
         Uses character-based chunking with word boundary detection to avoid
-        creating huge word lists in memory.
+        creating huge word lists in memory. Word boundaries are located once
+        with NumPy and looked up by binary search in _chunk_bounds (compiled
+        with numba when installed) instead of rescanning the text per chunk.
         
         Args:
-            text: Full text to split
+            pages: List of (page_number, text) tuples to split
             
         Returns:
-            List of chunk dictionaries
+            List of chunk dictionaries tagged with the page each chunk starts on
         """
-        if not text:
+        if not pages:
             return []
         
-        # Use a generator-based approach: find words on-demand without creating full list
+        page_nums = [page_num for page_num, _ in pages]
+        text = ' '.join(page_text for _, page_text in pages)
+        # Offset of each page within the joined text, for page lookup by chunk start
+        page_starts = np.cumsum([0] + [len(page_text) + 1 for _, page_text in pages[:-1]])
+        
         # Estimate words per chunk based on average word length (~5 chars + 1 space = 6)
         avg_chars_per_word = 6
         chunk_char_size = self.chunk_size * avg_chars_per_word
@@ -141,95 +282,40 @@ class PDFProcessor:
             return [{
                 'chunk_id': 0,
                 'text': text,
-                'page': self._extract_page(text)
+                'page': page_nums[0]
             }]
         
+        # Offsets of every space/newline, found in one vectorized pass.
+        # UTF-32 gives one array element per character, so offsets match str indices.
+        codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        breaks = np.flatnonzero((codes == 0x20) | (codes == 0x0A)).astype(np.int64)
+        # Word starts for counting: a non-space character after ASCII whitespace
+        # (\t\n\v\f\r and space), so runs of whitespace count once as split() does
+        is_space = (codes == 0x20) | ((codes >= 0x09) & (codes <= 0x0D))
+        prev_space = np.concatenate(([True], is_space[:-1]))
+        word_starts = np.flatnonzero(~is_space & prev_space).astype(np.int64)
+        
+        # Boundary search runs on the numeric indices only; Python just slices
+        bounds = _chunk_bounds(breaks, word_starts, is_space, len(text), chunk_char_size,
+                               overlap_char_size, self.chunk_size * 0.5)
+        page_idx = np.searchsorted(page_starts, bounds[:, 0], side='right') - 1
+        
         chunks = []
-        chunk_id = 0
-        start_idx = 0
-        text_len = len(text)
-        
-        # Use iterator to process text in chunks without loading all words
-        while start_idx < text_len:
-            # Calculate end position
-            end_idx = min(start_idx + chunk_char_size, text_len)
-            
-            # Adjust to word boundary if not at end
-            if end_idx < text_len:
-                # Look backwards for space/newline (up to 200 chars)
-                search_start = max(start_idx, end_idx - 200)
-                last_break = text.rfind(' ', search_start, end_idx)
-                if last_break == -1:
-                    last_break = text.rfind('\n', search_start, end_idx)
-                if last_break > search_start:
-                    end_idx = last_break + 1
-                else:
-                    # Look forwards for next space (up to 100 chars)
-                    next_break = text.find(' ', end_idx, min(end_idx + 100, text_len))
-                    if next_break != -1:
-                        end_idx = next_break + 1
-            
-            # Extract chunk text
+        for (start_idx, end_idx), idx in zip(bounds.tolist(), page_idx.tolist()):
             chunk_text = text[start_idx:end_idx].strip()
-            
-            # Verify word count is reasonable (check without splitting whole text)
             if chunk_text:
-                # Quick word count check on chunk only
-                word_count = len(chunk_text.split())
-                
-                # If chunk is too small, try to extend (but limit iterations)
-                if word_count < self.chunk_size * 0.5 and end_idx < text_len:
-                    # Extend to next good boundary
-                    next_break = text.find(' ', end_idx, min(end_idx + chunk_char_size, text_len))
-                    if next_break != -1:
-                        chunk_text = text[start_idx:next_break + 1].strip()
-                        end_idx = next_break + 1
-                
                 chunks.append({
-                    'chunk_id': chunk_id,
+                    'chunk_id': len(chunks),
                     'text': chunk_text,
-                    'page': self._extract_page(chunk_text)
+                    'page': page_nums[idx]
                 })
-                chunk_id += 1
-            
-            # Move to next chunk with overlap
-            if end_idx >= text_len:
-                break
-            
-            # Calculate overlap start
-            overlap_start = max(start_idx, end_idx - overlap_char_size)
-            # Find word boundary for overlap
-            if overlap_start < end_idx:
-                space_pos = text.find(' ', overlap_start, min(overlap_start + 200, text_len))
-                if space_pos != -1 and space_pos < end_idx:
-                    start_idx = space_pos + 1
-                else:
-                    # Find next word start
-                    match = re.search(r'\S', text[overlap_start:min(overlap_start + 200, text_len)])
-                    if match:
-                        start_idx = overlap_start + match.start()
-                    else:
-                        start_idx = end_idx
-            else:
-                start_idx = end_idx
-            
-            # Safety: prevent infinite loops
-            if start_idx >= end_idx:
-                start_idx = end_idx + 1
-                if start_idx >= text_len:
-                    break
         
         return chunks if chunks else [{
             'chunk_id': 0,
             'text': text,
-            'page': self._extract_page(text)
+            'page': page_nums[0]
         }]
     
-    def _extract_page(self, text: str) -> Optional[int]:
-        """Extract page number from text if available."""
-        match = re.search(r'\[Page\s+(\d+)\]', text)
-        return int(match.group(1)) if match else None
-    
     def extract_metadata(self, filepath: str) -> Dict[str, any]:
         """Extract metadata from filepath."""
         metadata = {
@@ -283,20 +369,23 @@ class PDFProcessor:
         logger.info(f"Processing: {filename}")
         
         # Extract text
-        full_text, page_count, method = self.extract_text_fast(pdf_path)
+        pages, page_count, method = self.extract_text_fast(pdf_path)
+        
+        # Clean text once, page by page, dropping pages left empty
+        pages = [(page_num, self.clean_text(text)) for page_num, text in pages]
+        pages = [(page_num, text) for page_num, text in pages if text]
+        # Full text is not kept: chunks carry the same content
+        total_chars = sum(len(text) for _, text in pages)
         
-        if not full_text or len(full_text.strip()) < 50:
+        if total_chars < 50:
             logger.warning(f"No text extracted from {filename} (may be scanned/image-only PDF)")
             # Still return document but mark as scanned
             is_scanned = True
         else:
             is_scanned = False
         
-        # Clean text once
-        full_text = self.clean_text(full_text)
-        
         # Split into chunks only if we have text
-        chunks = self.split_into_chunks(full_text) if full_text else []
+        chunks = self.split_into_chunks(pages)
         
         # Get metadata
         metadata = self.extract_metadata(pdf_path)
@@ -313,7 +402,6 @@ class PDFProcessor:
             'file_size': metadata['file_size'],
             'is_scanned': is_scanned,
             'text_chunks': chunks,
-            'full_text': full_text,
             'num_chunks': len(chunks),
             'num_pages': page_count,
             'metadata': {
@@ -322,5 +410,5 @@ class PDFProcessor:
             }
         }
         
-        logger.info(f"Processed: {filename} - {len(chunks)} chunks, {len(full_text)} chars, {page_count} pages")
+        logger.info(f"Processed: {filename} - {len(chunks)} chunks, {total_chars} chars, {page_count} pages")
         return doc
@@ -1,13 +1,185 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
+import logging
 import re
 import os
-import time
+import shutil
+import sys
+import threading
+import urllib3
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from datetime import datetime
+from urllib.parse import urlsplit
+
+from .metadata_utils import DateCache, date_cache_key, file_sha1
+
+logger = logging.getLogger(__name__)
+
+_WS_RE = re.compile(r'\s+')
+_TITLE_DATE_RE = re.compile(r'(\d{2})\.(\d{2})\.(\d{4})')
+_DOC_NUM_RE = re.compile(r'No\.\s*-?\s*(\d+)')
+_SLASHES_RE = re.compile(r'/{2,}')
+
+# Reading response.raw raises urllib3's own errors (ProtocolError, ReadTimeoutError),
+# not the requests wrappers iter_content used to produce
+DOWNLOAD_ERRORS = (requests.exceptions.RequestException, urllib3.exceptions.HTTPError, OSError)
+# The subset raised when a connection drops or stalls part way through a body
+BODY_READ_ERRORS = (
+    requests.exceptions.ChunkedEncodingError,
+    urllib3.exceptions.ProtocolError,
+    urllib3.exceptions.ReadTimeoutError,
+)
+
+# lxml's C parser is several times faster than html.parser on link-heavy pages
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# selectolax is a much faster choice when all we need is the page's anchors
+try:
+    from selectolax.lexbor import LexborHTMLParser as FastHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    try:
+        # Older selectolax releases only ship the Modest backend
+        from selectolax.parser import HTMLParser as FastHTMLParser
+        SELECTOLAX_AVAILABLE = True
+    except ImportError:
+        SELECTOLAX_AVAILABLE = False
+
+
+def iter_links(html, tags=('a',)):
+    """Yield (href, node) for every element in tags with an href, via selectolax when installed, else BeautifulSoup"""
+    if SELECTOLAX_AVAILABLE:
+        for node in FastHTMLParser(html).css(', '.join(f'{tag}[href]' for tag in tags)):
+            yield node.attributes.get('href') or '', node
+    else:
+        for node in BeautifulSoup(html, HTML_PARSER).find_all(list(tags), href=True):
+            yield node['href'], node
+
+
+def url_key(url):
+    """
+    Hash of a canonical form of a URL for duplicate detection: case-folded, no
+    fragment, no repeated or trailing slashes, and no query string on direct .pdf links
+    """
+    parts = urlsplit(url.lower())
+    path = _SLASHES_RE.sub('/', parts.path).rstrip('/')
+    query = '' if path.endswith('.pdf') else parts.query
+    return hash((parts.netloc, path, query))
+
+
+def find_container(node, tags):
+    """Nearest ancestor of a link whose tag is in tags, or None"""
+    if hasattr(node, 'find_parent'):
+        return node.find_parent(list(tags))
+    parent = node.parent
+    while parent is not None and parent.tag not in tags:
+        parent = parent.parent
+    return parent
+
+
+def save_response(response, filename, preallocate=False):
+    """
+    Stream a response body to filename in 1 MiB blocks, undoing any gzip/deflate
+    transfer encoding. The body goes to filename + '.part' and is moved into place
+    only once complete, so a dropped connection never leaves a truncated file that
+    later runs would skip as already downloaded. Returns the number of bytes written.
+
+    With preallocate, the temp file is reserved at the Content-Length up front so
+    it is written contiguously.
+    """
+    part = filename + '.part'
+    response.raw.decode_content = True
+    expected = int(response.headers.get('content-length') or 0) if preallocate else 0
+    try:
+        with open(part, 'wb') as f:
+            try:
+                if expected and hasattr(os, 'posix_fallocate'):
+                    try:
+                        os.posix_fallocate(f.fileno(), 0, expected)
+                    except OSError:
+                        pass
+                shutil.copyfileobj(response.raw, f, length=1024 * 1024)
+            finally:
+                # Drop any preallocated tail the body did not fill
+                size = f.tell()
+                f.truncate(size)
+        os.replace(part, filename)
+    except BaseException:
+        try:
+            os.unlink(part)
+        except OSError:
+            pass
+        raise
+    return size
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default timeout to requests that don't set one"""
+
+    def __init__(self, *args, timeout=(5, 30), **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+
+@dataclass
+class DocBatch:
+    """Scraped document links stored column-wise, one list per field"""
+    titles: list = field(default_factory=list)
+    dates: list = field(default_factory=list)
+    urls: list = field(default_factory=list)
+    sections: list = field(default_factory=list)
+
+    def append(self, title, date, url, section):
+        self.titles.append(title)
+        self.dates.append(date)
+        self.urls.append(url)
+        self.sections.append(section)
+
+    def __len__(self):
+        return len(self.titles)
+
+    def to_dicts(self, indices, link_key='url'):
+        """Materialize the selected rows as document dicts"""
+        return [
+            {'title': self.titles[i], 'date': self.dates[i], link_key: self.urls[i], 'section': self.sections[i]}
+            for i in indices
+        ]
+
 
 class BaseScraper:
-    def __init__(self):
+    # Reserve each download's Content-Length on disk up front (see save_response)
+    preallocate_downloads = False
+
+    def __init__(self, verify=False):
+        # One pooled session per scraper so every page fetch and download
+        # to the same host reuses keep-alive connections and TLS sessions.
+        # Certificate checks are off by default for the government sites with
+        # broken chains; scrapers for sites with valid certificates pass verify=True
         self.session = requests.Session()
+        self.session.verify = verify
+        adapter = TimeoutHTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # Opened per download directory by download_documents
+        self.date_cache = None
+        self._existing_files = set()
+        self._existing_lock = threading.Lock()
         self.source = None
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
@@ -28,70 +200,185 @@ class BaseScraper:
             r'system\s+update'
         ]
 
-    def is_citizen_relevant(self, doc):
-        """Check if a document is relevant for citizens"""
-        title = doc.get('title', '').lower()
-        download_link = doc.get('download_link', '').lower()
-        section = doc.get('section', '').lower()
+    def _relevance_patterns(self):
+        """Compile keyword/pattern lists into single alternations (on first use, after subclass setup)"""
+        if getattr(self, '_technical_re', None) is None:
+            self._technical_re = re.compile(
+                '|'.join(f'(?:{pattern})' for pattern in self.technical_patterns), re.IGNORECASE
+            )
+            self._citizen_re = re.compile(
+                '|'.join(re.escape(keyword) for keyword in self.citizen_relevant_keywords), re.IGNORECASE
+            )
+        return self._technical_re, self._citizen_re
+
+    def _is_relevant(self, title, download_link, section):
+        technical_re, citizen_re = self._relevance_patterns()
         
-        # Check for technical patterns first
-        for pattern in self.technical_patterns:
-            if re.search(pattern, title) or re.search(pattern, section):
-                return False
+        # Check for technical patterns first (NUL keeps matches from spanning fields)
+        if technical_re.search(f"{title}\x00{section}"):
+            return False
         
         # Check for citizen-relevant keywords
-        for keyword in self.citizen_relevant_keywords:
-            if keyword in title or keyword in download_link or keyword in section:
-                return True
-                
-        return False
+        return citizen_re.search(f"{title}\x00{download_link}\x00{section}") is not None
+
+    def is_citizen_relevant(self, doc):
+        """Check if a document is relevant for citizens"""
+        return self._is_relevant(doc.get('title', ''), doc.get('download_link', ''), doc.get('section', ''))
+
+    def _split_relevant(self, rows):
+        """
+        Split (title, download_link, section) rows into (citizen_indices, technical_indices).
+        The compiled patterns are fetched once for the whole scan rather than per row.
+        """
+        technical_re, citizen_re = self._relevance_patterns()
+        technical_search = technical_re.search
+        citizen_search = citizen_re.search
+        citizen_idx = []
+        technical_idx = []
+        for i, (title, download_link, section) in enumerate(rows):
+            if (not technical_search(f"{title}\x00{section}")
+                    and citizen_search(f"{title}\x00{download_link}\x00{section}")):
+                citizen_idx.append(i)
+            else:
+                technical_idx.append(i)
+        return citizen_idx, technical_idx
 
-    def download_with_retry(self, url, filename, max_retries=3):
-        """Download a file with retry logic"""
-        for attempt in range(max_retries):
+    def filter_batch(self, batch, match_urls=True):
+        """
+        Split a DocBatch into (citizen_indices, technical_indices)
+        """
+        urls = batch.urls if match_urls else [''] * len(batch)
+        return self._split_relevant(zip(batch.titles, urls, batch.sections))
+
+    def report_documents(self, documents, link_key='url', link_label='URL'):
+        """
+        Write the citizen-document listing to stdout in one call instead of a print per line
+        """
+        separator = "-" * 80
+        lines = [f"\nFound {len(documents)} citizen-relevant documents:", separator]
+        for i, doc in enumerate(documents, 1):
+            lines.append(f"{i}. {doc['title']}")
+            lines.append(f"   Date: {doc['date']}")
+            lines.append(f"   Section: {doc['section']}")
+            lines.append(f"   {link_label}: {doc[link_key]}")
+            lines.append(separator)
+        sys.stdout.write('\n'.join(lines) + '\n')
+
+    def download_with_retry(self, url, filename, body_attempts=2):
+        """
+        Download a file. Connect errors and retryable statuses are retried with backoff
+        by the session's adapter; that policy does not cover the body, so a connection
+        dropped while reading it restarts the download, up to body_attempts times.
+        """
+        for attempt in range(body_attempts):
             try:
-                response = self.session.get(
-                    url,
-                    headers=self.headers,
-                    verify=False,
-                    stream=True,
-                    timeout=30
-                )
-                
-                if response.status_code == 200:
+                response = self.session.get(url, headers=self.headers, stream=True)
+                try:
+                    if response.status_code != 200:
+                        print(f"Failed to download {filename}: HTTP {response.status_code}")
+                        return False
+                    if not self._accept_download(url, response):
+                        return False
                     os.makedirs(os.path.dirname(filename), exist_ok=True)
-                    with open(filename, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
-                    return True
-                else:
-                    print(f"Failed to download {filename}: HTTP {response.status_code}")
-                    
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    print(f"Attempt {attempt + 1} failed: {str(e)}. Retrying...")
-                    time.sleep(2 ** attempt)  # Exponential backoff
-                else:
-                    print(f"Failed to download {filename} after {max_retries} attempts: {str(e)}")
+                    save_response(response, filename, preallocate=self.preallocate_downloads)
+                finally:
+                    response.close()
+                return True
+                
+            except BODY_READ_ERRORS as e:
+                if attempt == body_attempts - 1:
+                    print(f"Failed to download {filename}: {str(e)}")
                     return False
+                print(f"Download of {filename} interrupted ({str(e)}); retrying")
+            except DOWNLOAD_ERRORS as e:
+                print(f"Failed to download {filename}: {str(e)}")
+                return False
         
         return False
 
-    def filter_documents(self, documents):
+    def _accept_download(self, url, response):
+        """Whether a 200 response should be saved; subclasses can reject by content type"""
+        return True
+
+    def download_documents(self, documents, download_dir, max_workers=8):
         """
-        Filter documents into citizen-relevant and technical categories
+        Download documents concurrently; each one is handled by _download_one.
+        Returns the non-None results of _download_one.
         """
-        citizen_docs = []
-        technical_docs = []
+        os.makedirs(download_dir, exist_ok=True)
+        # One directory listing up front instead of an exists() call per document
+        with os.scandir(download_dir) as entries:
+            self._existing_files = {entry.name for entry in entries}
+        # Cached release dates live with the PDFs they were read from
+        self.date_cache = DateCache(os.path.join(download_dir, DateCache.FILENAME))
+        results = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self._download_one, doc, download_dir): doc for doc in documents}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                    if result is not None:
+                        results.append(result)
+                except Exception as e:
+                    print(f"Error processing document {futures[future].get('title', '')}: {str(e)}")
+        self.date_cache.save()
+        return results
 
-        for doc in documents:
-            if self.is_citizen_relevant(doc):
-                citizen_docs.append(doc)
-            else:
-                technical_docs.append(doc)
+    def extract_release_dates(self, downloaded, extractor, max_workers=None):
+        """
+        Run extractor over (doc, filepath) pairs in a process pool, since PDF text
+        extraction is CPU-bound, and store each date found on its doc
+        """
+        if not downloaded:
+            return
+        paths = [filepath for _, filepath in downloaded]
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            dates = executor.map(extractor, paths, chunksize=4)
+            for (doc, filepath), pdf_date in zip(downloaded, dates):
+                if pdf_date:
+                    logger.debug("[PDF Date Extracted] %s: %s", os.path.basename(filepath), pdf_date)
+                    doc['date'] = pdf_date
+
+    def _claim_filename(self, filename):
+        """Reserve a filename for download; False if it already exists or another thread claimed it"""
+        with self._existing_lock:
+            if filename in self._existing_files:
+                return False
+            self._existing_files.add(filename)
+            return True
+
+    def _release_filename(self, filename):
+        """Give up a claimed filename after a failed download"""
+        with self._existing_lock:
+            self._existing_files.discard(filename)
+
+    def cached_release_date(self, filepath, extractor):
+        """
+        Release date of a downloaded PDF, parsing it only if this extractor's result
+        for the same content is cached. A None result (no date, or a failed parse)
+        is not cached, so the file is tried again on the next run.
+        """
+        key = date_cache_key(extractor, file_sha1(filepath))
+        if self.date_cache is not None and key in self.date_cache:
+            return self.date_cache.get(key)
+        date = extractor(filepath)
+        if date is not None and self.date_cache is not None:
+            self.date_cache.set(key, date)
+        return date
 
-        return citizen_docs, technical_docs
+    def _download_one(self, doc, download_dir):
+        """Download a single document, to be implemented by child classes"""
+        raise NotImplementedError("Subclasses must implement _download_one()")
+
+    def filter_documents(self, documents):
+        """
+        Filter documents into citizen-relevant and technical categories
+        """
+        citizen_idx, technical_idx = self._split_relevant(
+            (doc.get('title', ''), doc.get('download_link', ''), doc.get('section', ''))
+            for doc in documents
+        )
+        return [documents[i] for i in citizen_idx], [documents[i] for i in technical_idx]
 
     def make_request(self, url, method='GET', **kwargs):
         """
@@ -109,26 +396,23 @@ class BaseScraper:
         """
         Parse HTML content using BeautifulSoup
         """
-        return BeautifulSoup(html_content, 'html.parser')
+        return BeautifulSoup(html_content, HTML_PARSER)
 
     def clean_text(self, text):
         """
-        Clean extracted text
+        Clean extracted text by collapsing whitespace and newlines
         """
         if text:
-            return ' '.join(text.split())
+            return _WS_RE.sub(' ', text).strip()
         return ''
 
+    # Kept as an alias for older callers
+    _clean_text = clean_text
+
     def scrape(self, start_date=None, end_date=None):
         """Base scrape method to be implemented by child classes"""
         raise NotImplementedError("Subclasses must implement scrape()")
 
-    def _clean_text(self, text):
-        """Clean up text by removing extra whitespace and newlines"""
-        if text:
-            return ' '.join(text.strip().split())
-        return ''
-
     def get_unique_filename(self, original_filename, title="", section=""):
         """Generate a shorter, unique filename"""
         # Get file extension
@@ -144,11 +428,11 @@ class BaseScraper:
             doc_type = "DOC"
         
         # Extract date if present
-        date_match = re.search(r'(\d{2})\.(\d{2})\.(\d{4})', title)
+        date_match = _TITLE_DATE_RE.search(title)
         date_str = f"{date_match.group(3)}{date_match.group(2)}{date_match.group(1)}" if date_match else "NODATE"
         
         # Extract document number if present
-        num_match = re.search(r'No\.\s*-?\s*(\d+)', title)
+        num_match = _DOC_NUM_RE.search(title)
         doc_num = num_match.group(1) if num_match else "XX"
         
         # Create shorter filename
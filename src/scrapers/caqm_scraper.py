@@ -1,38 +1,30 @@
-from .base_scraper import BaseScraper
-from .metadata_utils import extract_date, clean_title, determine_section, build_filename, extract_release_date_from_pdf
-import requests
-from bs4 import BeautifulSoup
+from .base_scraper import BaseScraper, DocBatch, iter_links, find_container, url_key
+from .metadata_utils import extract_date, clean_title, determine_section, build_filename, extract_first_page_text, element_text, node_key
 import urllib3
 import os
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-import pdfplumber
 import re
-from datetime import datetime
+
+# (pattern, group to return): keyword-anchored dates first, then the first date found.
+# Compiled once at import rather than on every PDF.
+_DATE_PATTERNS = tuple((re.compile(pattern, re.IGNORECASE), group) for pattern, group in (
+    (r'(date[:\s]*)(\d{2}[/-]\d{2}[/-]\d{4})', 2),
+    (r'(issued on[:\s]*)(\d{2}[/-]\d{2}[/-]\d{4})', 2),
+    (r'(\d{2})[/-](\d{2})[/-](\d{4})', 0),
+    (r'(\d{4})[/-](\d{2})[/-](\d{2})', 0),
+    (r'(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{4}', 0),
+    (r'\d{1,2}\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4}', 0),
+))
 
 def extract_release_date_from_pdf(pdf_path):
-    date_patterns = [
-        r'(?i)(date[:\\s]*)(\\d{2}[/-]\\d{2}[/-]\\d{4})',
-        r'(?i)(issued on[:\\s]*)(\\d{2}[/-]\\d{2}[/-]\\d{4})',
-        r'(\\d{2})[/-](\\d{2})[/-](\\d{4})',
-        r'(\\d{4})[/-](\\d{2})[/-](\\d{2})',
-        r'(?:January|February|March|April|May|June|July|August|September|October|November|December)\\s+\\d{1,2},?\\s+\\d{4}',
-        r'\\d{1,2}\\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)\\s+\\d{4}',
-    ]
+    """CAQM variant: prefer a date next to 'Date'/'Issued on', else the first date on page one."""
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            first_page = pdf.pages[0]
-            text = first_page.extract_text()
-            if text:
-                # 1. Look for date near keywords
-                for pattern in date_patterns[:2]:
-                    match = re.search(pattern, text)
-                    if match:
-                        return match.group(2)
-                # 2. Fallback: first date found
-                for pattern in date_patterns[2:]:
-                    match = re.search(pattern, text)
-                    if match:
-                        return match.group(0)
+        text = extract_first_page_text(pdf_path)
+        if text:
+            for pattern, group in _DATE_PATTERNS:
+                match = pattern.search(text)
+                if match:
+                    return match.group(group)
     except Exception as e:
         print(f"Error reading PDF {pdf_path}: {e}")
     return None
@@ -53,7 +45,6 @@ class CAQMScraper(BaseScraper):
             'Accept-Language': 'en-US,en;q=0.5',
             'Connection': 'keep-alive',
         }
-        self.session = requests.Session()
         self.citizen_relevant_keywords.extend([
             'air quality', 'pollution', 'environment',
             'health', 'public', 'notification', 'order',
@@ -76,73 +67,69 @@ class CAQMScraper(BaseScraper):
             if response.status_code != 200:   
                 print(f"Failed to access page. Status code: {response.status_code}")
                 return []
-            soup = BeautifulSoup(response.text, 'html.parser')
-            pdf_links = []
+            pdf_links = DocBatch()
             seen_urls = set()
-            all_links = soup.find_all('a', href=True)
-            for link in all_links:
+            # Date found in each container, so sibling links in one row/block don't re-read its text
+            container_dates = {}
+            # Section found walking up from each ancestor, shared by all links on the page
+            section_cache = {}
+            # Raw bytes let the parser sniff the encoding itself
+            for href_raw, link in iter_links(response.content):
                 try:
-                    href = link['href'].lower()
-                    if href.endswith('.pdf') or 'writereaddata' in href:
-                        if href.startswith('http'):
-                            download_link = href
+                    # Lowercase once for the tests; build the URL from the original to keep its case
+                    href_lc = href_raw.lower()
+                    if href_lc.endswith('.pdf') or 'writereaddata' in href_lc:
+                        if href_lc.startswith('http'):
+                            download_link = href_raw
                         else:
-                            href = href.replace('..', '')
-                            download_link = f"{self.base_url}/{href.lstrip('/')}"
-                        if download_link in seen_urls:
+                            download_link = f"{self.base_url}/{href_raw.replace('..', '').lstrip('/')}"
+                        key = url_key(download_link)
+                        if key in seen_urls:
                             continue
-                        seen_urls.add(download_link)
-                        title = clean_title(link.text)
+                        seen_urls.add(key)
+                        title = clean_title(element_text(link))
                         if not title:
                             continue
-                        parent = link.find_parent(['td', 'p', 'div'])
-                        date = extract_date(parent.text) if parent else extract_date(title)
-                        section = determine_section(title, link)
-                        doc = {
-                            'date': date,
-                            'title': title,
-                            'download_link': download_link,
-                            'section': section
-                        }
-                        pdf_links.append(doc)
+                        parent = find_container(link, ('td', 'p', 'div'))
+                        if parent is not None:
+                            container_key = node_key(parent)
+                            if container_key not in container_dates:
+                                container_dates[container_key] = extract_date(element_text(parent))
+                            date = container_dates[container_key]
+                        else:
+                            date = extract_date(title)
+                        section = determine_section(title, link, ancestor_cache=section_cache)
+                        pdf_links.append(title, date, download_link, section)
                 except Exception as e:
                     print(f"Error processing link: {str(e)}")
                     continue
-            citizen_documents, technical_documents = self.filter_documents(pdf_links)
-            print(f"\nFound {len(citizen_documents)} citizen-relevant documents:")
-            print("-" * 80)
-            for i, doc in enumerate(citizen_documents, 1):
-                print(f"{i}. {doc['title']}")
-                print(f"   Date: {doc['date']}")
-                print(f"   Section: {doc['section']}")
-                print(f"   Download Link: {doc['download_link']}")
-                print("-" * 80)
-            print(f"\nSkipping {len(technical_documents)} technical documents:")
-            for doc in citizen_documents:
-                try:
-                    download_dir = os.path.join('downloads', self.__class__.__name__.lower().replace('scraper', ''), 'citizen_docs')
-                    os.makedirs(download_dir, exist_ok=True)
-                    filename = build_filename(doc['title'], doc['date'], doc['section'])
-                    filepath = os.path.join(download_dir, filename)
-                    if os.path.exists(filepath):
-                        print(f"Skipping existing file: {filename}")
-                        continue
-                    print(f"Downloading citizen-relevant document: {filename}")
-                    if self.download_with_retry(doc['download_link'], filepath):
-                        # Try to extract date from PDF after download
-                        pdf_date = extract_release_date_from_pdf(filepath)
-                        if pdf_date:
-                            print(f"[PDF Date Extracted] {filename}: {pdf_date}")
-                            doc['date'] = pdf_date
-                        print(f"Successfully downloaded: {filepath}")
-                    else:
-                        print(f"Failed to download: {filename}")
-                except Exception as e:
-                    print(f"Error processing document: {str(e)}")
-                    continue
+            citizen_idx, technical_idx = self.filter_batch(pdf_links)
+            citizen_documents = pdf_links.to_dicts(citizen_idx, link_key='download_link')
+            self.report_documents(citizen_documents, link_key='download_link', link_label='Download Link')
+            print(f"\nSkipping {len(technical_idx)} technical documents:")
+            download_dir = os.path.join('downloads', self.__class__.__name__.lower().replace('scraper', ''), 'citizen_docs')
+            self.download_documents(citizen_documents, download_dir)
             return citizen_documents
         except Exception as e:
             print(f"Error during scraping: {str(e)}")
             import traceback
             print(traceback.format_exc())
             return []
+
+    def _download_one(self, doc, download_dir):
+        filename = build_filename(doc['title'], doc['date'], doc['section'])
+        filepath = os.path.join(download_dir, filename)
+        if not self._claim_filename(filename):
+            print(f"Skipping existing file: {filename}")
+            return
+        print(f"Downloading citizen-relevant document: {filename}")
+        if self.download_with_retry(doc['download_link'], filepath):
+            # Try to extract date from PDF after download
+            pdf_date = self.cached_release_date(filepath, extract_release_date_from_pdf)
+            if pdf_date:
+                print(f"[PDF Date Extracted] {filename}: {pdf_date}")
+                doc['date'] = pdf_date
+            print(f"Successfully downloaded: {filepath}")
+        else:
+            self._release_filename(filename)
+            print(f"Failed to download: {filename}")
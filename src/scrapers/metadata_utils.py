@@ -1,117 +1,294 @@
 import re
+import os
+import json
+import hashlib
+import threading
 from datetime import datetime
+from functools import lru_cache
 from bs4 import BeautifulSoup
-import pdfplumber
+
+# PyMuPDF reads a single page far faster than pdfplumber/pdfminer
+try:
+    import fitz  # PyMuPDF
+    FITZ_AVAILABLE = True
+except ImportError:
+    FITZ_AVAILABLE = False
+
+# Month names factored on shared prefixes (Ju-ne/ly, Ma-rch/y, A-pril/ugust) so
+# the engine commits to one branch per position instead of trying all twelve
+_MONTHS = r'(?:J(?:anuary|u(?:ne|ly))|February|Ma(?:rch|y)|A(?:pril|ugust)|September|October|November|December)'
+
+# All four formats in one scan. The lookahead consumes nothing, so a date
+# overlapping another one is still seen, and no two formats can start at the
+# same position, so lastgroup says which format matched. The leading class lets
+# re skip straight to positions where a date could start.
+_DATE_RE = re.compile(
+    r'(?=[\dJFMASOND])'
+    r'(?=(?P<dmy>\d{2}[/-]\d{2}[/-]\d{4})'
+    r'|(?P<ymd>\d{4}[/-]\d{2}[/-]\d{2})'
+    r'|(?P<mdy>' + _MONTHS + r'\s+\d{1,2},?\s+\d{4})'
+    r'|(?P<dmy_name>\d{1,2}\s+' + _MONTHS + r'\s+\d{4}))'
+)
+_DATE_PRIORITY = ('dmy', 'ymd', 'mdy', 'dmy_name')
+
+def _parse_date(kind, value):
+    if kind == 'dmy':
+        return datetime.strptime(f"{value[6:10]}-{value[3:5]}-{value[0:2]}", "%Y-%m-%d")
+    if kind == 'ymd':
+        return datetime.strptime(f"{value[0:4]}-{value[5:7]}-{value[8:10]}", "%Y-%m-%d")
+    if kind == 'mdy':
+        return datetime.strptime(value, "%B %d, %Y")
+    return datetime.strptime(value, "%d %B %Y")
 
 def extract_date(text):
     """
     Extract a date from text using common patterns. Returns date as YYYY-MM-DD or None.
     """
-    date_patterns = [
-        r'(\d{2})[/-](\d{2})[/-](\d{4})',  # DD/MM/YYYY or DD-MM-YYYY
-        r'(\d{4})[/-](\d{2})[/-](\d{2})',  # YYYY/MM/DD or YYYY-MM-DD
-        r'(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{4}',
-        r'\d{1,2}\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4}',
-        r'\d{2}/\d{2}/\d{4}',
-        r'\d{2}-\d{2}-\d{4}'
-    ]
-    for pattern in date_patterns:
-        match = re.search(pattern, text)
-        if match:
+    # Only the first occurrence of each format is tried, in format priority order.
+    # A format is parsed as soon as nothing ranked above it is still pending.
+    first = {}
+    pending = 0
+    for match in _DATE_RE.finditer(text):
+        kind = match.lastgroup
+        if kind in first:
+            continue
+        first[kind] = match.group(kind)
+        while pending < len(_DATE_PRIORITY) and _DATE_PRIORITY[pending] in first:
+            kind = _DATE_PRIORITY[pending]
+            try:
+                return _parse_date(kind, first[kind]).strftime("%Y-%m-%d")
+            except ValueError:
+                pending += 1
+    for kind in _DATE_PRIORITY[pending:]:
+        if kind in first:
             try:
-                groups = match.groups()
-                if len(groups) == 3:
-                    if len(groups[0]) == 4:  # YYYY-MM-DD
-                        return datetime.strptime(f"{groups[0]}-{groups[1]}-{groups[2]}", "%Y-%m-%d").strftime("%Y-%m-%d")
-                    else:  # DD-MM-YYYY
-                        return datetime.strptime(f"{groups[2]}-{groups[1]}-{groups[0]}", "%Y-%m-%d").strftime("%Y-%m-%d")
-                else:
-                    # For month name formats
-                    try:
-                        return datetime.strptime(match.group(0), "%B %d, %Y").strftime("%Y-%m-%d")
-                    except:
-                        try:
-                            return datetime.strptime(match.group(0), "%d %B %Y").strftime("%Y-%m-%d")
-                        except:
-                            pass
-            except Exception:
+                return _parse_date(kind, first[kind]).strftime("%Y-%m-%d")
+            except ValueError:
                 continue
     return None
 
+_WS_RE = re.compile(r'\s+')
+
 def clean_title(text):
     """Clean and normalize document title."""
     if text:
-        return ' '.join(text.strip().split())
+        return _WS_RE.sub(' ', text).strip()
     return ''
 
-def determine_section(text, element=None):
+def element_text(element):
+    """Text of a BeautifulSoup element or selectolax node."""
+    if hasattr(element, 'get_text'):
+        return element.get_text()
+    return element.text() or ''
+
+def iter_ancestors(element):
+    """Yield the element followed by its ancestors, for BeautifulSoup or selectolax trees."""
+    if hasattr(element, 'parents'):
+        yield element
+        yield from element.parents
+        return
+    node = element
+    while node is not None:
+        yield node
+        node = node.parent
+
+# Section keywords in priority order; one regex scan finds all that occur
+_SECTION_KEYWORDS = (
+    ('notification', 'Notifications'),
+    ('circular', 'Circulars'),
+    ('order', 'Orders'),
+    ('pressrelease', 'Press Releases'),
+    ('press release', 'Press Releases'),
+    ('speech', 'Speeches'),
+)
+_SECTION_RE = re.compile(r'notification|circular|order|press ?release|speech', re.IGNORECASE)
+_PARENT_SECTION_RE = re.compile(r'notification|circular|order', re.IGNORECASE)
+
+def _match_section(pattern, text):
+    """Highest-priority section whose keyword occurs in text, or None."""
+    found = {match.lower() for match in pattern.findall(text)}
+    if found:
+        for keyword, section in _SECTION_KEYWORDS:
+            if keyword in found:
+                return section
+    return None
+
+@lru_cache(maxsize=4096)
+def _section_from_text(text):
+    """Section named in a link's own text; listings repeat the same titles, so results are memoized."""
+    return _match_section(_SECTION_RE, text)
+
+def node_key(element):
+    """Stable identity for a tree node (selectolax wrappers are recreated on every access)."""
+    return id(element) if hasattr(element, 'parents') else element.mem_id
+
+def determine_section(text, element=None, ancestor_cache=None):
     """
     Determine section from text or BeautifulSoup element context.
+    ancestor_cache is an optional dict, shared across the links of one page, that
+    remembers the section found walking up from each node so common ancestors are
+    only read once.
     """
-    text = text.lower() if text else ''
-    if 'notification' in text:
-        return 'Notifications'
-    if 'circular' in text:
-        return 'Circulars'
-    if 'order' in text:
-        return 'Orders'
-    if 'pressrelease' in text or 'press release' in text:
-        return 'Press Releases'
-    if 'speech' in text:
-        return 'Speeches'
+    section = _section_from_text(text) if text else None
+    if section:
+        return section
     # Try parent context if element is provided
     if element:
-        for parent in [element] + list(element.parents):
-            parent_text = parent.get_text().lower()
-            if 'notification' in parent_text:
-                return 'Notifications'
-            if 'circular' in parent_text:
-                return 'Circulars'
-            if 'order' in parent_text:
-                return 'Orders'
+        if ancestor_cache is None:
+            for parent in iter_ancestors(element):
+                section = _match_section(_PARENT_SECTION_RE, element_text(parent))
+                if section:
+                    return section
+            return 'Other'
+        walked = []
+        for parent in iter_ancestors(element):
+            key = node_key(parent)
+            if key in ancestor_cache:
+                section = ancestor_cache[key]
+                break
+            walked.append(key)
+            section = _match_section(_PARENT_SECTION_RE, element_text(parent))
+            if section:
+                break
+        # Every node passed on the way up leads to the same answer
+        for key in walked:
+            ancestor_cache[key] = section
+        if section:
+            return section
     return 'Other'
 
+_INVALID_CHARS = re.compile(r'[^\w\s-]')
+_SPACE_TRANS = str.maketrans({' ': '_'})
+
 def build_filename(title, date=None, section=None, ext='.pdf'):
     """Standardize filename construction."""
-    base = re.sub(r'[^\w\s-]', '', title)[:50].strip().replace(' ', '_')
+    base = _INVALID_CHARS.sub('', title)[:50].strip().translate(_SPACE_TRANS)
     section = section or 'Document'
     date = date or 'NODATE'
     filename = f"{section}_{base}_{date}{ext}"
     return filename
 
+def date_cache_key(extractor, sha1):
+    """DateCache key for the date extractor found in a file with content hash sha1."""
+    return f"{extractor.__module__}.{extractor.__qualname__}:{DATE_CACHE_VERSION}:{sha1}"
+
+def file_sha1(path, chunk_size=1024 * 1024):
+    """SHA1 of a file's contents, read in chunks."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+# Part of every DateCache key; bump it when a release-date extractor changes
+# so dates cached by the old code are parsed again
+DATE_CACHE_VERSION = 1
+
+class DateCache:
+    """
+    On-disk cache of PDF release dates, so re-runs over the same documents skip
+    parsing the PDF. Entries are keyed by the extractor and the file's content
+    SHA1 (see date_cache_key). Safe to share between download threads.
+    """
+
+    FILENAME = '.date_cache.json'
+
+    def __init__(self, path=os.path.join('downloads', FILENAME)):
+        self.path = path
+        self._lock = threading.Lock()
+        self._dirty = False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self._dates = json.load(f)
+        except (OSError, ValueError):
+            self._dates = {}
+
+    def __contains__(self, key):
+        return key in self._dates
+
+    def get(self, key):
+        return self._dates.get(key)
+
+    def set(self, key, date):
+        with self._lock:
+            self._dates[key] = date
+            self._dirty = True
+
+    def save(self):
+        """Write the cache atomically (temp file + os.replace) if it changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._dates, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+def extract_first_page_text(pdf_path):
+    """
+    Return the text of the first page of a PDF.
+    Uses PyMuPDF when available and falls back to pdfminer (e.g. for files fitz cannot open).
+    """
+    if FITZ_AVAILABLE:
+        try:
+            with fitz.open(pdf_path, filetype="pdf") as doc:
+                if doc.page_count == 0:
+                    return ''
+                return doc.load_page(0).get_text("text")
+        except Exception:
+            pass
+    # pdfminer (installed with pdfplumber) stops after page one, without pdfplumber's char/table layer
+    from pdfminer.high_level import extract_text
+    return extract_text(pdf_path, maxpages=1)
+
+_RELEASE_KEYWORD_RE = re.compile(r'date|issued|notification|order|published|release', re.IGNORECASE)
+
+def _dated_lines(text):
+    """
+    Yield (line_start, line_end, date) for each line of text holding a date, in order.
+    The date is the first occurrence of the highest-priority format on that line.
+    """
+    line_end = -1
+    first = {}
+    for match in _DATE_RE.finditer(text):
+        kind = match.lastgroup
+        value = match.group(kind)
+        # \s can span a newline, but dates are only looked for within a line
+        if '\n' in value:
+            continue
+        pos = match.start()
+        if pos > line_end:
+            if first:
+                yield line_start, line_end, next(first[k] for k in _DATE_PRIORITY if k in first)
+                first = {}
+            line_start = text.rfind('\n', 0, pos) + 1
+            line_end = text.find('\n', pos)
+            if line_end == -1:
+                line_end = len(text)
+        first.setdefault(kind, value)
+    if first:
+        yield line_start, line_end, next(first[k] for k in _DATE_PRIORITY if k in first)
+
 def extract_release_date_from_pdf(pdf_path):
     """
     Extract the most likely release date from the first page of a PDF using keyword proximity.
     Returns the date string if found, else None.
     """
-    date_patterns = [
-        r'(\d{2})[/-](\d{2})[/-](\d{4})',  # DD/MM/YYYY or DD-MM-YYYY
-        r'(\d{4})[/-](\d{2})[/-](\d{2})',  # YYYY/MM/DD or YYYY-MM-DD
-        r'(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{4}',
-        r'\d{1,2}\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4}',
-    ]
-    keywords = ["date", "issued", "notification", "order", "published", "release"]
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            first_page = pdf.pages[0]
-            text = first_page.extract_text()
-            if not text:
-                return None
-            lines = text.split('\n')
-            # 1. Search for date near keywords
-            for line in lines:
-                lower_line = line.lower()
-                if any(kw in lower_line for kw in keywords):
-                    for pattern in date_patterns:
-                        match = re.search(pattern, line)
-                        if match:
-                            return match.group(0)
-            # 2. Fallback: first date found on the page
-            for line in lines:
-                for pattern in date_patterns:
-                    match = re.search(pattern, line)
-                    if match:
-                        return match.group(0)
+        text = extract_first_page_text(pdf_path)
+        if not text:
+            return None
+        # One scan over the page: the first dated line that mentions a keyword
+        # wins, else the first dated line at all
+        fallback = None
+        for line_start, line_end, date in _dated_lines(text):
+            if _RELEASE_KEYWORD_RE.search(text, line_start, line_end):
+                return date
+            if fallback is None:
+                fallback = date
+        return fallback
     except Exception as e:
         print(f"Error reading PDF {pdf_path}: {e}")
     return None 
\ No newline at end of file
@@ -1,14 +1,20 @@
-from bs4 import BeautifulSoup
-from .base_scraper import BaseScraper
-from .metadata_utils import extract_date, clean_title, determine_section, build_filename, extract_release_date_from_pdf
+from .base_scraper import BaseScraper, iter_links, find_container, save_response
+from .metadata_utils import extract_date, clean_title, determine_section, build_filename, extract_release_date_from_pdf, element_text
 import os
-import requests
+import logging
 import time
 import urllib3
 
 # Disable SSL warnings for government websites
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Per-link and per-download messages are DEBUG with %-style arguments, so they
+# cost nothing unless enabled; logging's handler lock keeps download threads'
+# lines from interleaving
+logger = logging.getLogger(__name__)
+
+_RBI_DOCS_BASE = 'https://rbidocs.rbi.org.in'
+
 class RBIScraper(BaseScraper):
     def __init__(self, download_dir=None):
         super().__init__()
@@ -16,7 +22,6 @@ class RBIScraper(BaseScraper):
         if download_dir is None:
             download_dir = os.path.join('downloads', 'rbi', 'citizen_docs')
         self.download_dir = download_dir
-        self.session = requests.Session()
         self.urls = {
             'press_releases': 'https://www.rbi.org.in/Scripts/BS_PressReleaseDisplay.aspx'
         }
@@ -33,51 +38,58 @@ class RBIScraper(BaseScraper):
         os.makedirs(self.download_dir, exist_ok=True)
 
     def _get_full_url(self, url):
-        if url.startswith('http'):
+        # One slice classifies the link instead of a chain of startswith calls
+        head = url[:4]
+        if head == 'http':
             return url
-        elif url.startswith('//'):
-            return f"https:{url}"
-        elif url.startswith('/'):
-            return f"https://rbidocs.rbi.org.in{url}"
-        else:
-            return f"https://rbidocs.rbi.org.in/{url}"
+        if head[:2] == '//':
+            return 'https:' + url
+        if head[:1] == '/':
+            return _RBI_DOCS_BASE + url
+        return _RBI_DOCS_BASE + '/' + url
 
-    def find_pdf_links(self, soup):
+    def find_pdf_links(self, html):
         documents = []
-        for link in soup.find_all(['a', 'link'], href=True):
+        # Section found walking up from each ancestor, shared by all links on the page
+        section_cache = {}
+        # Only anchors are visited, but the tree is kept whole: titles, dates and
+        # sections fall back to the enclosing cell, row or block
+        for href, link in iter_links(html, ('a', 'link')):
             try:
-                href = link['href']
-                title = clean_title(link.text)
-                if not title:
-                    parent = link.find_parent(['td', 'tr', 'div'])
-                    if parent:
-                        title = clean_title(parent.get_text())
+                # Classify the href first; most anchors are navigation and need no text work
+                # (three substring tests on one lowercased copy measure well ahead of a
+                # case-insensitive alternation on these short URLs)
+                href_lc = href.lower()
+                if not (href.endswith('.pdf') or
+                        'notification' in href_lc or
+                        'circular' in href_lc or
+                        'pressrelease' in href_lc):
+                    continue
+                title = clean_title(element_text(link))
+                parent = find_container(link, ('td', 'tr', 'div'))
+                if not title and parent is not None:
+                    title = clean_title(element_text(parent))
                 if not title:
                     continue
                 full_url = self._get_full_url(href)
-                parent = link.find_parent(['td', 'tr', 'div'])
-                date = extract_date(parent.get_text()) if parent else extract_date(title)
-                section = determine_section(title, link)
-                if (href.endswith('.pdf') or 
-                    'notification' in href.lower() or
-                    'circular' in href.lower() or
-                    'pressrelease' in href.lower()):
-                    doc = {
-                        'title': title,
-                        'download_link': full_url,
-                        'date': date,
-                        'section': section
-                    }
-                    documents.append(doc)
+                date = extract_date(element_text(parent)) if parent is not None else extract_date(title)
+                section = determine_section(title, link, ancestor_cache=section_cache)
+                doc = {
+                    'title': title,
+                    'download_link': full_url,
+                    'date': date,
+                    'section': section
+                }
+                documents.append(doc)
             except Exception as e:
-                print(f"Error processing link: {str(e)}")
+                logger.debug("Error processing link: %s", e)
                 continue
         return documents
 
-    def download_document(self, doc):
+    def download_document(self, doc, with_release_date=True):
         url = doc['download_link']
         if not url.startswith('http'):
-            url = f"https://rbidocs.rbi.org.in{url}"
+            url = _RBI_DOCS_BASE + url
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -85,24 +97,35 @@ class RBIScraper(BaseScraper):
             'Connection': 'keep-alive',
         }
         try:
-            response = self.session.get(url, headers=headers, verify=False, timeout=30)
-            if response.status_code == 200:
+            # Stream the body to disk rather than holding the whole PDF in memory
+            with self.session.get(url, headers=headers, verify=False, timeout=30, stream=True) as response:
+                if response.status_code != 200:
+                    return False
                 filename = build_filename(doc['title'], doc['date'], doc['section'])
                 filepath = os.path.join(self.download_dir, filename)
-                os.makedirs(os.path.dirname(filepath), exist_ok=True)
-                with open(filepath, 'wb') as f:
-                    f.write(response.content)
-                # Try to extract date from PDF after download
-                pdf_date = extract_release_date_from_pdf(filepath)
-                if pdf_date:
-                    print(f"[PDF Date Extracted] {filename}: {pdf_date}")
-                    doc['date'] = pdf_date
-                print(f"Successfully downloaded: {filepath} (size: {os.path.getsize(filepath)} bytes)")
-                return True
+                size = save_response(response, filepath)
+            # Try to extract date from PDF after download
+            pdf_date = extract_release_date_from_pdf(filepath) if with_release_date else None
+            if pdf_date:
+                logger.debug("[PDF Date Extracted] %s: %s", filename, pdf_date)
+                doc['date'] = pdf_date
+            logger.debug("Successfully downloaded: %s (size: %d bytes)", filepath, size)
+            return True
         except Exception as e:
-            print(f"Error downloading {url}: {str(e)}")
+            logger.warning("Error downloading %s: %s", url, e)
         return False
 
+    def _download_one(self, doc, download_dir):
+        filename = build_filename(doc['title'], doc['date'], doc['section'])
+        if not self._claim_filename(filename):
+            logger.debug("Skipping existing file: %s", filename)
+            return None
+        # Dates are read afterwards in a process pool; see scrape()
+        if not self.download_document(doc, with_release_date=False):
+            self._release_filename(filename)
+            return None
+        return doc, os.path.join(download_dir, filename)
+
     def scrape(self, start_date=None, end_date=None):
         url = self.urls['press_releases']
         headers = {
@@ -114,20 +137,14 @@ class RBIScraper(BaseScraper):
         response = self.session.get(url, verify=False)
         all_documents = []
         if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            documents = self.find_pdf_links(soup)
+            # Raw bytes, so the parser sniffs the encoding itself
+            documents = self.find_pdf_links(response.content)
             citizen_documents, technical_documents = self.filter_documents(documents)
-            print(f"\nFound {len(citizen_documents)} citizen-relevant documents:")
-            print("-" * 80)
-            for i, doc in enumerate(citizen_documents, 1):
-                print(f"{i}. {doc['title']}")
-                print(f"   Date: {doc['date']}")
-                print(f"   Section: {doc['section']}")
-                print(f"   Download Link: {doc['download_link']}")
-                print("-" * 80)
-            print(f"\nSkipping {len(technical_documents)} technical documents")
-            for doc in citizen_documents:
-                self.download_document(doc)
+            self.report_documents(citizen_documents, link_key='download_link', link_label='Download Link')
+            logger.info("Skipping %d technical documents", len(technical_documents))
+            downloaded = self.download_documents(citizen_documents, self.download_dir)
+            self.extract_release_dates(downloaded, extract_release_date_from_pdf)
+            logger.info("Downloaded %d of %d citizen-relevant documents", len(downloaded), len(citizen_documents))
             all_documents = citizen_documents
         return all_documents
 
@@ -144,4 +161,5 @@ def scrape_rbi():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     scrape_rbi()
\ No newline at end of file
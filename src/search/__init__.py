@@ -1,6 +1,6 @@
-from .es_setup import ElasticsearchSetup
+from .es_setup import ElasticsearchSetup, get_shared_setup
 from .search_service import SearchService
+from .faiss_backend import FAISS_AVAILABLE, FaissSearchService, export_faiss_index
 
-__all__ = ['ElasticsearchSetup', 'SearchService']
-
-
+__all__ = ['ElasticsearchSetup', 'SearchService', 'get_shared_setup',
+           'FAISS_AVAILABLE', 'FaissSearchService', 'export_faiss_index']
@@ -3,28 +3,94 @@ Elasticsearch setup and configuration for document indexing.
 """
 
 import logging
-from typing import Dict, Optional, List
+import threading
+from typing import ClassVar, Dict, Iterable, Optional, List, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
 try:
-    from elasticsearch import Elasticsearch
+    from elasticsearch import Elasticsearch, BadRequestError
     ELASTICSEARCH_AVAILABLE = True
 except ImportError:
     ELASTICSEARCH_AVAILABLE = False
     logger.error("elasticsearch package not available. Install it for indexing.")
 
+# Optional: orjson encodes large bulk payloads and embedding vectors much faster
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if ELASTICSEARCH_AVAILABLE and ORJSON_AVAILABLE:
+    from elasticsearch.serializer import JsonSerializer, NdjsonSerializer
+
+    class _OrjsonMixin:
+        """Swap the stdlib json calls of a client serializer for orjson."""
+
+        def json_dumps(self, data) -> bytes:
+            # Embedding vectors are passed as numpy arrays and encoded natively
+            return orjson.dumps(data, default=self.default, option=orjson.OPT_SERIALIZE_NUMPY)
+
+        def json_loads(self, data: bytes):
+            return orjson.loads(data)
+
+    class OrjsonJsonSerializer(_OrjsonMixin, JsonSerializer):
+        """orjson-backed serializer for regular JSON requests."""
+
+    class OrjsonNdjsonSerializer(_OrjsonMixin, NdjsonSerializer):
+        """orjson-backed serializer for bulk (NDJSON) requests."""
+
+    FAST_SERIALIZERS = {
+        JsonSerializer.mimetype: OrjsonJsonSerializer(),
+        NdjsonSerializer.mimetype: OrjsonNdjsonSerializer(),
+    }
+else:
+    FAST_SERIALIZERS = None
+
+
+# Fields left out of search hits unless asked for: a 384-dim vector is most of
+# a hit's JSON and no result page uses it
+DEFAULT_SOURCE_EXCLUDES = ["embedding"]
+
+# Only the parts of a search response that results are built from; shard
+# stats, ids and index names are left out of the response body
+HIT_FILTER_PATH = ["hits.hits._source", "hits.hits._score", "hits.hits.highlight",
+                   "hits.hits.fields"]
+
+# kNN candidate pool: at least this many per shard, growing with the page size,
+# up to Elasticsearch's hard limit
+KNN_MIN_CANDIDATES = 200
+KNN_MAX_CANDIDATES = 10000
+
+# Plain-text passages of text_chunk around the matched terms
+TEXT_CHUNK_HIGHLIGHT = {
+    "fields": {
+        "text_chunk": {
+            "fragment_size": 200,
+            "number_of_fragments": 3,
+            "pre_tags": [""],
+            "post_tags": [""]
+        }
+    }
+}
+
 
 class ElasticsearchSetup:
     """Setup and manage Elasticsearch index for document search."""
     
+    # Indices already known to exist in this process, so repeated setup
+    # calls (e.g. one per worker) skip the round-trip to Elasticsearch
+    _index_ready: ClassVar[Set[str]] = set()
+    
     def __init__(self, 
                  host: str = "localhost",
                  port: int = 9200,
                  username: str = "elastic",
                  password: Optional[str] = None,
                  use_ssl: bool = False,
-                 verify_certs: bool = False):
+                 verify_certs: bool = False,
+                 http_compress: bool = False):
         """
         Initialize Elasticsearch client.
         
@@ -35,6 +101,8 @@ class ElasticsearchSetup:
             password: Elasticsearch password (if required)
             use_ssl: Whether to use SSL
             verify_certs: Whether to verify SSL certificates
+            http_compress: gzip request bodies and accept gzipped responses;
+                worth it for large responses (embedding vectors) over a network
         """
         if not ELASTICSEARCH_AVAILABLE:
             raise ImportError("elasticsearch package is required. Install it first.")
@@ -49,6 +117,13 @@ class ElasticsearchSetup:
             "request_timeout": 60
         }
         
+        # Use orjson for request/response bodies when available
+        if FAST_SERIALIZERS:
+            connection_params["serializers"] = FAST_SERIALIZERS
+        
+        if http_compress:
+            connection_params["http_compress"] = True
+        
         # Add authentication if provided
         if username and password:
             connection_params["basic_auth"] = (username, password)
@@ -74,7 +149,8 @@ class ElasticsearchSetup:
             raise
     
     def create_index(self, index_name: str, embedding_dim: int = 384, 
-                     delete_existing: bool = False) -> bool:
+                     delete_existing: bool = False,
+                     vector_index_type: Optional[str] = "int8_hnsw") -> bool:
         """
         Create Elasticsearch index with proper mapping for document search.
         
@@ -82,18 +158,22 @@ class ElasticsearchSetup:
             index_name: Name of the index to create
             embedding_dim: Dimension of embedding vectors (default: 384 for all-MiniLM-L6-v2)
             delete_existing: Whether to delete existing index if it exists
+            vector_index_type: HNSW variant for the embedding field. The default
+                int8_hnsw has Elasticsearch (8.12+) quantize vectors to int8 on
+                write, so the graph takes a quarter of the memory while queries
+                still send float vectors. None uses the server default.
             
         Returns:
             True if index was created successfully
         """
         # Delete existing index if requested
-        if delete_existing and self.es.indices.exists(index=index_name):
+        if delete_existing:
             logger.info(f"Deleting existing index: {index_name}")
-            self.es.indices.delete(index=index_name)
+            self.es.options(ignore_status=404).indices.delete(index=index_name)
+            ElasticsearchSetup._index_ready.discard(index_name)
         
-        # Check if index already exists
-        if self.es.indices.exists(index=index_name):
-            logger.info(f"Index {index_name} already exists")
+        # Already created or seen by this process
+        if index_name in ElasticsearchSetup._index_ready:
             return True
         
         # Define index mapping
@@ -101,8 +181,11 @@ class ElasticsearchSetup:
             "mappings": {
                 "properties": {
                     "doc_id": {"type": "keyword"},
+                    # Titles and chunks are short and similar in length, so
+                    # per-document length norms add index size for no ranking gain
                     "title": {
                         "type": "text",
+                        "norms": False,
                         "fields": {
                             "keyword": {"type": "keyword"}
                         }
@@ -111,7 +194,7 @@ class ElasticsearchSetup:
                     "date": {"type": "date"},
                     "section": {"type": "keyword"},
                     "chunk_id": {"type": "integer"},
-                    "text_chunk": {"type": "text"},
+                    "text_chunk": {"type": "text", "norms": False},
                     "page": {"type": "integer"},
                     "embedding": {
                         "type": "dense_vector",
@@ -119,7 +202,13 @@ class ElasticsearchSetup:
                         "index": True,
                         "similarity": "cosine"
                     },
-                    "full_text": {"type": "text"},
+                    # Precomputed chunk summary, shown but never searched
+                    "summary": {"type": "text", "index": False},
+                    "summary_model": {"type": "keyword"},
+                    # Optional int8 copy of the embedding (base64) for cheap
+                    # display; kNN always uses the float field above
+                    "embedding_q": {"type": "binary"},
+                    "embedding_scale": {"type": "float", "index": False},
                     "filename": {"type": "keyword"},
                     "filepath": {"type": "keyword"},
                     "is_scanned": {"type": "boolean"},
@@ -136,15 +225,41 @@ class ElasticsearchSetup:
             }
         }
         
-        # Create index
+        embedding_mapping = mapping["mappings"]["properties"]["embedding"]
+        if vector_index_type:
+            embedding_mapping["index_options"] = {"type": vector_index_type}
+        
+        # Create index - attempting the create and treating "already exists" as
+        # success is idempotent and avoids an exists() probe racing other workers
         try:
-            # Elasticsearch 8.x API - mappings and settings are separate parameters
-            self.es.indices.create(
-                index=index_name,
-                mappings=mapping.get('mappings', {}),
-                settings=mapping.get('settings', {})
-            )
+            try:
+                # Elasticsearch 8.x API - mappings and settings are separate parameters
+                self.es.indices.create(
+                    index=index_name,
+                    mappings=mapping.get('mappings', {}),
+                    settings=mapping.get('settings', {})
+                )
+            except BadRequestError as e:
+                # Servers older than 8.12 reject quantized index_options
+                if e.error != 'mapper_parsing_exception' or "index_options" not in embedding_mapping:
+                    raise
+                logger.warning(f"{vector_index_type} not supported by this server, "
+                               f"creating {index_name} with the default vector index: {e}")
+                del embedding_mapping["index_options"]
+                self.es.indices.create(
+                    index=index_name,
+                    mappings=mapping.get('mappings', {}),
+                    settings=mapping.get('settings', {})
+                )
             logger.info(f"Created index: {index_name} with embedding dimension: {embedding_dim}")
+            ElasticsearchSetup._index_ready.add(index_name)
+            return True
+        except BadRequestError as e:
+            if e.error != 'resource_already_exists_exception':
+                logger.error(f"Failed to create index: {e}")
+                return False
+            logger.info(f"Index {index_name} already exists")
+            ElasticsearchSetup._index_ready.add(index_name)
             return True
         except Exception as e:
             logger.error(f"Failed to create index: {e}")
@@ -170,45 +285,240 @@ class ElasticsearchSetup:
             logger.error(f"Failed to index document: {e}")
             return False
     
-    def bulk_index(self, index_name: str, documents: list) -> bool:
+    def bulk_index(self, index_name: str, documents: Iterable[Dict]) -> bool:
         """
         Bulk index multiple documents (more efficient).
         
         Args:
             index_name: Name of the index
-            documents: List of document dictionaries
+            documents: Document dictionaries; any iterable, consumed lazily
             
         Returns:
             True if bulk indexing was successful
         """
-        if not documents:
-            return True
+        success, failed = self.stream_bulk_index(index_name, documents)
+        return failed == 0
+    
+    def stream_bulk_index(self, index_name: str, documents: Iterable[Dict],
+                          thread_count: int = 4, chunk_size: int = 500,
+                          queue_size: int = 4) -> Tuple[int, int]:
+        """
+        Index documents with parallel bulk requests, without building the whole
+        action list in memory: chunks are encoded and sent from several threads
+        while the input iterable is still being produced.
         
+        Args:
+            index_name: Name of the index
+            documents: Document dictionaries; a generator keeps memory constant
+            thread_count: Number of threads sending bulk requests
+            chunk_size: Number of documents per bulk request
+            queue_size: Number of chunks buffered ahead of the sending threads
+            
+        Returns:
+            Tuple of (documents indexed, documents failed)
+        """
+        success = 0
+        failed = 0
         try:
-            from elasticsearch.helpers import bulk
+            from elasticsearch.helpers import parallel_bulk
             
-            actions = [
+            actions = (
                 {
                     "_index": index_name,
                     "_source": doc
                 }
                 for doc in documents
-            ]
+            )
             
-            success, failed = bulk(self.es, actions, raise_on_error=False)
+            for ok, info in parallel_bulk(self.es, actions,
+                                          thread_count=thread_count,
+                                          chunk_size=chunk_size,
+                                          queue_size=queue_size,
+                                          raise_on_error=False):
+                if ok:
+                    success += 1
+                else:
+                    failed += 1
+                    logger.debug(f"Bulk item failed: {info}")
             
             if failed:
-                logger.warning(f"Failed to index {len(failed)} documents out of {len(documents)}")
+                logger.warning(f"Failed to index {failed} documents out of {success + failed}")
             
             logger.info(f"Bulk indexed {success} documents to {index_name}")
-            return len(failed) == 0
             
         except Exception as e:
             logger.error(f"Bulk indexing failed: {e}")
+            # The rest of the stream was not sent; make sure callers see a failure
+            failed += 1
+        
+        return success, failed
+    
+    def begin_bulk(self, index_name: str) -> bool:
+        """
+        Tune an index for a bulk load: no periodic refresh, larger translog.
+        
+        Args:
+            index_name: Name of the index about to be loaded
+            
+        Returns:
+            True if settings were applied
+        """
+        try:
+            self.es.indices.put_settings(
+                index=index_name,
+                settings={
+                    "index": {
+                        "refresh_interval": "-1",
+                        "translog.flush_threshold_size": "2gb"
+                    }
+                }
+            )
+            logger.info(f"Disabled refresh on {index_name} for bulk load")
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to apply bulk settings to {index_name}: {e}")
+            return False
+    
+    def end_bulk(self, index_name: str, force_merge: bool = True) -> bool:
+        """
+        Restore normal index settings after a bulk load and optionally merge segments.
+        
+        Args:
+            index_name: Name of the loaded index
+            force_merge: Whether to force merge the index down to one segment
+            
+        Returns:
+            True if settings were restored
+        """
+        try:
+            self.es.indices.put_settings(
+                index=index_name,
+                settings={
+                    "index": {
+                        "refresh_interval": "1s",
+                        "translog.flush_threshold_size": None
+                    }
+                }
+            )
+            logger.info(f"Restored refresh on {index_name}")
+        except Exception as e:
+            logger.error(f"Failed to restore settings on {index_name}: {e}")
             return False
+        
+        if force_merge:
+            try:
+                # Merging can take minutes on a large index
+                self.es.options(request_timeout=600).indices.forcemerge(
+                    index=index_name, max_num_segments=1
+                )
+                logger.info(f"Force merged {index_name} to a single segment")
+            except Exception as e:
+                logger.warning(f"Force merge failed on {index_name}: {e}")
+        
+        return True
+    
+    @staticmethod
+    def _source_filter(source_includes: Optional[List[str]],
+                       source_excludes: Optional[List[str]]) -> Dict:
+        """Keyword arguments for es.search that trim the returned _source."""
+        if source_excludes is None and source_includes is None:
+            source_excludes = DEFAULT_SOURCE_EXCLUDES
+        params = {}
+        if source_includes:
+            params["source_includes"] = source_includes
+        if source_excludes:
+            params["source_excludes"] = source_excludes
+        return params
+    
+    @staticmethod
+    def _knn_query(query_embedding: List[float], size: int,
+                   filters: Optional[Dict] = None,
+                   num_candidates: Optional[int] = None) -> Dict:
+        """kNN clause for a semantic search."""
+        # Build knn query for Elasticsearch 8.x (using indexed dense vectors)
+        # Note: similarity is defined in mapping, not in query
+        # A fixed cap of 100 starved large pages of candidates and hurt recall
+        if num_candidates is None:
+            num_candidates = max(size * 10, KNN_MIN_CANDIDATES)
+        num_candidates = min(max(num_candidates, size), KNN_MAX_CANDIDATES)
+        knn = {
+            "field": "embedding",
+            "query_vector": query_embedding,
+            "k": size,
+            "num_candidates": num_candidates
+        }
+        
+        # Build filter if provided
+        filter_clauses = []
+        if filters:
+            if "source" in filters:
+                filter_clauses.append({"term": {"source": filters["source"]}})
+            
+            if "section" in filters:
+                filter_clauses.append({"term": {"section": filters["section"]}})
+        
+        # If filters exist, add them to knn query
+        if filter_clauses:
+            knn["filter"] = filter_clauses if len(filter_clauses) == 1 else {"bool": {"must": filter_clauses}}
+        
+        return knn
+    
+    @staticmethod
+    def _knn_highlight(highlight_text: str) -> Dict:
+        """Highlight request for kNN hits, which have no query terms of their own."""
+        return dict(
+            TEXT_CHUNK_HIGHLIGHT,
+            highlight_query={"match": {"text_chunk": highlight_text}}
+        )
+    
+    @staticmethod
+    def _keyword_query(query_text: str, filters: Optional[Dict] = None) -> Dict:
+        """BM25 query over chunk text and title."""
+        # Build keyword search query
+        query = {
+            "bool": {
+                "should": [
+                    {"match": {"text_chunk": {"query": query_text, "boost": 2.0}}},
+                    {"match": {"title": {"query": query_text, "boost": 1.5}}}
+                ],
+                "minimum_should_match": 1
+            }
+        }
+        
+        # Add filters if provided
+        if filters:
+            query["bool"]["filter"] = []
+            
+            if "source" in filters:
+                query["bool"]["filter"].append({"term": {"source": filters["source"]}})
+            
+            if "section" in filters:
+                query["bool"]["filter"].append({"term": {"section": filters["section"]}})
+        
+        return query
+    
+    @staticmethod
+    def _hit_results(response, highlights: bool = False) -> list:
+        """Turn a search response into result dicts with 'score' (and 'highlights', 'fields')."""
+        results = []
+        # filter_path drops 'hits' entirely when nothing matched
+        for hit in response.get('hits', {}).get('hits', []):
+            result = hit['_source']
+            result['score'] = hit['_score']
+            if highlights:
+                result['highlights'] = hit.get('highlight', {}).get('text_chunk', [])
+            if 'fields' in hit:
+                result['fields'] = hit['fields']
+            results.append(result)
+        return results
     
     def search(self, index_name: str, query_embedding: List[float], 
-               size: int = 10, filters: Optional[Dict] = None) -> list:
+               size: int = 10, filters: Optional[Dict] = None,
+               source_includes: Optional[List[str]] = None,
+               source_excludes: Optional[List[str]] = None,
+               num_candidates: Optional[int] = None,
+               highlight_text: Optional[str] = None,
+               script_fields: Optional[Dict] = None) -> list:
         """
         Perform semantic search using dense vector search (knn query for Elasticsearch 8.x).
         
@@ -217,47 +527,41 @@ class ElasticsearchSetup:
             query_embedding: Query embedding vector
             size: Number of results to return
             filters: Optional filters (e.g., {"source": "rbi"})
+            num_candidates: HNSW candidates per shard, trading speed for recall;
+                defaults to max(size * 10, 200), capped at 10000
+            source_includes: Only return these _source fields
+            source_excludes: Leave these _source fields out; defaults to the
+                embedding vector when neither argument is given
+            highlight_text: Query text to pick passages by; a kNN search has
+                no terms of its own, so highlighting needs them passed in
+            script_fields: Values for Elasticsearch to compute per hit (e.g.
+                a slice of a large field), returned in each result's 'fields'
             
         Returns:
-            List of search results
+            List of search results; with highlight_text, each carries
+            'highlights', its text_chunk passages matching that text
         """
+        source_params = self._source_filter(source_includes, source_excludes)
         try:
-            # Build knn query for Elasticsearch 8.x (using indexed dense vectors)
-            # Note: similarity is defined in mapping, not in query
-            knn = {
-                "field": "embedding",
-                "query_vector": query_embedding,
-                "k": size,
-                "num_candidates": min(size * 10, 100)  # Consider more candidates for better results
-            }
-            
-            # Build filter if provided
-            filter_clauses = []
-            if filters:
-                if "source" in filters:
-                    filter_clauses.append({"term": {"source": filters["source"]}})
-                
-                if "section" in filters:
-                    filter_clauses.append({"term": {"section": filters["section"]}})
+            knn = self._knn_query(query_embedding, size, filters, num_candidates)
             
-            # If filters exist, add them to knn query
-            if filter_clauses:
-                knn["filter"] = filter_clauses if len(filter_clauses) == 1 else {"bool": {"must": filter_clauses}}
+            extra_params = {}
+            if highlight_text:
+                extra_params["highlight"] = self._knn_highlight(highlight_text)
+            if script_fields:
+                extra_params["script_fields"] = script_fields
             
             # Perform knn search
             response = self.es.search(
                 index=index_name,
                 knn=knn,
-                size=size
+                size=size,
+                filter_path=HIT_FILTER_PATH,
+                **source_params,
+                **extra_params
             )
             
-            results = []
-            for hit in response['hits']['hits']:
-                result = hit['_source']
-                result['score'] = hit['_score']
-                results.append(result)
-            
-            return results
+            return self._hit_results(response, highlights=bool(highlight_text))
             
         except Exception as e:
             # Fallback: use match_all query (just return documents)
@@ -280,7 +584,7 @@ class ElasticsearchSetup:
                     
                     query = {"bool": bool_query}
                 
-                response = self.es.search(index=index_name, query=query, size=size)
+                response = self.es.search(index=index_name, query=query, size=size, **source_params)
                 
                 results = []
                 for hit in response['hits']['hits']:
@@ -298,7 +602,9 @@ class ElasticsearchSetup:
                 return []
     
     def keyword_search(self, index_name: str, query_text: str,
-                      size: int = 10, filters: Optional[Dict] = None) -> list:
+                      size: int = 10, filters: Optional[Dict] = None,
+                      source_includes: Optional[List[str]] = None,
+                      source_excludes: Optional[List[str]] = None) -> list:
         """
         Perform basic keyword search using BM25 algorithm.
         
@@ -307,42 +613,27 @@ class ElasticsearchSetup:
             query_text: Search query text
             size: Number of results to return
             filters: Optional filters (e.g., {"source": "rbi"})
+            source_includes: Only return these _source fields
+            source_excludes: Leave these _source fields out; defaults to the
+                embedding vector when neither argument is given
             
         Returns:
-            List of search results
+            List of search results; each carries 'highlights', the best
+            matching passages of its text_chunk
         """
-        # Build keyword search query
-        query = {
-            "bool": {
-                "should": [
-                    {"match": {"text_chunk": {"query": query_text, "boost": 2.0}}},
-                    {"match": {"title": {"query": query_text, "boost": 1.5}}},
-                    {"match": {"full_text": {"query": query_text}}}
-                ],
-                "minimum_should_match": 1
-            }
-        }
-        
-        # Add filters if provided
-        if filters:
-            query["bool"]["filter"] = []
-            
-            if "source" in filters:
-                query["bool"]["filter"].append({"term": {"source": filters["source"]}})
-            
-            if "section" in filters:
-                query["bool"]["filter"].append({"term": {"section": filters["section"]}})
+        query = self._keyword_query(query_text, filters)
         
         try:
-            response = self.es.search(index=index_name, query=query, size=size)
-            
-            results = []
-            for hit in response['hits']['hits']:
-                result = hit['_source']
-                result['score'] = hit['_score']
-                results.append(result)
+            response = self.es.search(
+                index=index_name,
+                query=query,
+                size=size,
+                highlight=TEXT_CHUNK_HIGHLIGHT,
+                filter_path=HIT_FILTER_PATH,
+                **self._source_filter(source_includes, source_excludes)
+            )
             
-            return results
+            return self._hit_results(response, highlights=True)
             
         except Exception as e:
             logger.error(f"Keyword search failed: {e}")
@@ -350,7 +641,151 @@ class ElasticsearchSetup:
             traceback.print_exc()
             return []
     
+    def msearch(self, index_name: str, bodies: List[Dict]) -> List[Dict]:
+        """
+        Run several searches in one _msearch request.
+        
+        Args:
+            index_name: Name of the index
+            bodies: Search request bodies
+            
+        Returns:
+            One response per body, in order; a failed search's entry holds
+            an 'error' key instead of hits
+        """
+        searches = []
+        for body in bodies:
+            searches.append({"index": index_name})
+            searches.append(body)
+        return self.es.msearch(searches=searches)['responses']
+    
+    def search_many(self, index_name: str, query_embedding: List[float],
+                    query_text: str, searches: List[Tuple[str, Optional[Dict]]],
+                    size: int = 10,
+                    source_includes: Optional[List[str]] = None,
+                    source_excludes: Optional[List[str]] = None) -> List[list]:
+        """
+        Several searches for the same query in one round trip.
+        
+        All searches go out in a single _msearch request, which Elasticsearch
+        runs concurrently. Any that fails there is retried through search()
+        or keyword_search(), so fallbacks behave as they do alone.
+        
+        Args:
+            index_name: Name of the index
+            query_embedding: Query embedding vector
+            query_text: Search query text
+            searches: (search_type, filters) pairs, search_type being
+                'semantic' or 'keyword' and filters e.g. {"source": "rbi"}
+            size: Number of results per search
+            source_includes: Only return these _source fields
+            source_excludes: Leave these _source fields out; defaults to the
+                embedding vector when neither argument is given
+            
+        Returns:
+            One result list per search, in order, each result carrying
+            'highlights' like keyword_search results
+        """
+        # _msearch takes the _source filter in each body, not as URL parameters
+        source_params = self._source_filter(source_includes, source_excludes)
+        source = {}
+        if "source_includes" in source_params:
+            source["includes"] = source_params["source_includes"]
+        if "source_excludes" in source_params:
+            source["excludes"] = source_params["source_excludes"]
+        
+        bodies = []
+        for search_type, filters in searches:
+            if search_type == 'semantic':
+                body = {
+                    "knn": self._knn_query(query_embedding, size, filters),
+                    "size": size,
+                    "highlight": self._knn_highlight(query_text)
+                }
+            else:
+                body = {
+                    "query": self._keyword_query(query_text, filters),
+                    "size": size,
+                    "highlight": TEXT_CHUNK_HIGHLIGHT
+                }
+            if source:
+                body["_source"] = source
+            bodies.append(body)
+        
+        try:
+            responses = self.msearch(index_name, bodies)
+        except Exception as e:
+            logger.warning(f"Multi-search failed: {e}. Running searches separately.")
+            responses = [{"error": str(e)}] * len(bodies)
+        
+        results = []
+        for (search_type, filters), response in zip(searches, responses):
+            if "error" not in response:
+                results.append(self._hit_results(response, highlights=True))
+            elif search_type == 'semantic':
+                results.append(self.search(
+                    index_name, query_embedding, size, filters,
+                    source_includes, source_excludes, highlight_text=query_text
+                ))
+            else:
+                results.append(self.keyword_search(
+                    index_name, query_text, size, filters, source_includes, source_excludes
+                ))
+        return results
+    
+    def search_both(self, index_name: str, query_embedding: List[float],
+                    query_text: str, size: int = 10,
+                    filters: Optional[Dict] = None,
+                    source_includes: Optional[List[str]] = None,
+                    source_excludes: Optional[List[str]] = None) -> Tuple[list, list]:
+        """
+        Semantic and keyword search for the same query in one round trip.
+        
+        Args:
+            Same as search_many, with one filters dict for both searches
+            
+        Returns:
+            Tuple of (semantic results, keyword results)
+        """
+        semantic_results, keyword_results = self.search_many(
+            index_name, query_embedding, query_text,
+            [('semantic', filters), ('keyword', filters)],
+            size, source_includes, source_excludes
+        )
+        return semantic_results, keyword_results
+    
     def get_client(self):
         """Get the underlying Elasticsearch client."""
         return self.es
 
+
+# One ElasticsearchSetup per connection config in this process, so callers
+# (and each pool worker) share a client and its connection pool instead of
+# reconnecting and pinging on every call
+_SHARED_SETUPS: Dict[Tuple, ElasticsearchSetup] = {}
+_SHARED_SETUPS_LOCK = threading.Lock()
+
+
+def get_shared_setup(**kwargs) -> ElasticsearchSetup:
+    """
+    Get the process-wide ElasticsearchSetup for a connection config.
+    
+    The first call with a given set of arguments connects; later calls with
+    the same arguments return that instance. Worker processes each build
+    their own on first use.
+    
+    Args:
+        **kwargs: Arguments accepted by ElasticsearchSetup
+        
+    Returns:
+        Shared ElasticsearchSetup instance
+    """
+    key = tuple(sorted(kwargs.items()))
+    setup = _SHARED_SETUPS.get(key)
+    if setup is None:
+        with _SHARED_SETUPS_LOCK:
+            setup = _SHARED_SETUPS.get(key)
+            if setup is None:
+                setup = ElasticsearchSetup(**kwargs)
+                _SHARED_SETUPS[key] = setup
+    return setup
@@ -0,0 +1,202 @@
+"""
+Local FAISS HNSW index for semantic search without an Elasticsearch round trip.
+
+Elasticsearch stays the source of truth: export_faiss_index() copies the
+embeddings and chunk fields out of an index, and FaissSearchService answers
+semantic queries from the exported files.
+"""
+
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Optional: only needed for the FAISS backend
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+try:
+    from ..embeddings.embedding_service import EmbeddingService
+except ImportError:
+    # Fallback for when running as script
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from embeddings.embedding_service import EmbeddingService
+
+INDEX_FILENAME = "index.faiss"
+METADATA_FILENAME = "metadata.json"
+
+# HNSW graph degree and search breadth; efSearch is raised per query when
+# more results are needed
+HNSW_M = 32
+HNSW_EF_SEARCH = 128
+
+
+def export_faiss_index(es_setup, index_name: str, output_dir: str,
+                       batch_size: int = 1000) -> int:
+    """
+    Build a FAISS HNSW index from the embeddings stored in Elasticsearch.
+
+    Args:
+        es_setup: ElasticsearchSetup instance
+        index_name: Elasticsearch index to export
+        output_dir: Directory for index.faiss and metadata.json
+        batch_size: Documents fetched per scroll page
+
+    Returns:
+        Number of chunks exported
+    """
+    if not FAISS_AVAILABLE:
+        raise ImportError("faiss is required. Install with: pip install faiss-cpu")
+    from elasticsearch.helpers import scan
+
+    vectors = []
+    metadata = []
+    for hit in scan(es_setup.es, index=index_name, query={"query": {"match_all": {}}},
+                    size=batch_size):
+        doc = hit['_source']
+        embedding = doc.pop('embedding', None)
+        # The int8 display copy is not needed alongside the index
+        doc.pop('embedding_q', None)
+        doc.pop('embedding_scale', None)
+        if embedding is None:
+            continue
+        vectors.append(embedding)
+        metadata.append(doc)
+
+    if not vectors:
+        logger.warning(f"No embeddings found in index '{index_name}'")
+        return 0
+
+    # Stored embeddings are unit length, so inner product is cosine similarity
+    matrix = np.asarray(vectors, dtype=np.float32)
+    index = faiss.IndexHNSWFlat(matrix.shape[1], HNSW_M, faiss.METRIC_INNER_PRODUCT)
+    index.add(matrix)
+
+    os.makedirs(output_dir, exist_ok=True)
+    faiss.write_index(index, os.path.join(output_dir, INDEX_FILENAME))
+    with open(os.path.join(output_dir, METADATA_FILENAME), 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, ensure_ascii=False)
+
+    logger.info(f"Exported {len(metadata)} chunks from '{index_name}' to {output_dir}")
+    return len(metadata)
+
+
+class FaissSearchService:
+    """Semantic search over an exported FAISS index, mirroring SearchService.search."""
+
+    def __init__(self,
+                 embedding_service: EmbeddingService,
+                 index_dir: str = "faiss_index"):
+        """
+        Load the index and chunk metadata written by export_faiss_index.
+
+        Args:
+            embedding_service: EmbeddingService instance (same model as the export)
+            index_dir: Directory holding index.faiss and metadata.json
+        """
+        if not FAISS_AVAILABLE:
+            raise ImportError("faiss is required. Install with: pip install faiss-cpu")
+
+        self.embedding_service = embedding_service
+        self.index_dir = index_dir
+        self.index = faiss.read_index(os.path.join(index_dir, INDEX_FILENAME))
+        self.index.hnsw.efSearch = HNSW_EF_SEARCH
+        with open(os.path.join(index_dir, METADATA_FILENAME), 'r', encoding='utf-8') as f:
+            self.metadata = json.load(f)
+
+        # Filter columns as arrays so a filter is one vectorized comparison
+        self._filter_columns = {
+            field: np.array([doc.get(field) for doc in self.metadata], dtype=object)
+            for field in ("source", "section")
+        }
+        logger.info(f"Loaded FAISS index with {self.index.ntotal} chunks from {index_dir}")
+
+    def _filter_mask(self, filters: Dict) -> Optional[np.ndarray]:
+        """Boolean mask of chunks matching every filter, or None for no filters."""
+        mask = None
+        for field, value in filters.items():
+            field_mask = self._filter_columns[field] == value
+            mask = field_mask if mask is None else mask & field_mask
+        return mask
+
+    def search(self, query: str,
+               size: int = 10,
+               source: Optional[str] = None,
+               section: Optional[str] = None) -> List[Dict]:
+        """
+        Search for documents using semantic similarity.
+
+        Args:
+            query: Search query text
+            size: Number of results to return
+            source: Filter by source (rbi, income_tax, caqm)
+            section: Filter by section (Notifications, Circulars, etc.)
+
+        Returns:
+            List of search results with scores on Elasticsearch's cosine
+            scale, (1 + cosine) / 2
+        """
+        filters = {}
+        if source:
+            filters["source"] = source
+        if section:
+            filters["section"] = section
+        mask = self._filter_mask(filters)
+
+        total = self.index.ntotal
+        wanted = min(size, total if mask is None else int(mask.sum()))
+        if wanted <= 0:
+            return []
+
+        query_vector = np.asarray(self.embedding_service.generate_embedding(query),
+                                  dtype=np.float32)[None]
+
+        # Over-fetch so filtered-out neighbours still leave enough hits;
+        # widen until they do
+        k = size * 3 if mask is not None else size
+        while True:
+            k = min(k, total)
+            self.index.hnsw.efSearch = max(HNSW_EF_SEARCH, k)
+            scores, ids = self.index.search(query_vector, k)
+            scores, ids = scores[0], ids[0]
+            keep = ids >= 0
+            if mask is not None:
+                keep &= mask[np.where(keep, ids, 0)]
+            if keep.sum() >= wanted or k == total:
+                break
+            k *= 2
+
+        results = []
+        for score, doc_id in zip(scores[keep][:size], ids[keep][:size]):
+            result = dict(self.metadata[doc_id])
+            result['score'] = float((1.0 + score) / 2.0)
+            results.append(result)
+        return results
+
+    def search_many(self, query: str,
+                    searches: List[Tuple[str, Optional[str], Optional[str]]],
+                    size: int = 10) -> List[List[Dict]]:
+        """
+        Run several semantic searches for one query, like SearchService.search_many.
+        
+        Args:
+            query: Search query text
+            searches: (search_type, source, section) triples; only 'semantic'
+                is supported, there is no keyword index here
+            size: Number of results per search
+            
+        Returns:
+            One result list per search, in order
+        """
+        if any(search_type != 'semantic' for search_type, _, _ in searches):
+            raise ValueError("The FAISS backend only supports semantic search")
+        return [self.search(query, size=size, source=source, section=section)
+                for _, source, section in searches]
@@ -3,10 +3,14 @@ Search service for semantic document search.
 """
 
 import logging
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Distinct query strings whose embeddings each SearchService keeps
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+
 from .es_setup import ElasticsearchSetup
 try:
     from ..embeddings.embedding_service import EmbeddingService
@@ -36,11 +40,20 @@ class SearchService:
         self.es_setup = es_setup
         self.embedding_service = embedding_service
         self.index_name = index_name
+        # Repeated queries (reloads, paging, the app re-running a search) skip the
+        # encoder; the embedding does not depend on filters, so the query
+        # string alone is the key
+        self._query_embedding = lru_cache(maxsize=QUERY_EMBEDDING_CACHE_SIZE)(
+            self.embedding_service.generate_embedding
+        )
     
     def search(self, query: str, 
                size: int = 10,
                source: Optional[str] = None,
-               section: Optional[str] = None) -> List[Dict]:
+               section: Optional[str] = None,
+               source_includes: Optional[List[str]] = None,
+               source_excludes: Optional[List[str]] = None,
+               script_fields: Optional[Dict] = None) -> List[Dict]:
         """
         Search for documents using semantic similarity.
         
@@ -49,12 +62,17 @@ class SearchService:
             size: Number of results to return
             source: Filter by source (rbi, income_tax, caqm)
             section: Filter by section (Notifications, Circulars, etc.)
+            source_includes: Only return these fields of each hit
+            source_excludes: Leave these fields out (default: the embedding vector)
+            script_fields: Values computed per hit by Elasticsearch, returned
+                in each result's 'fields'
             
         Returns:
-            List of search results with scores
+            List of search results with scores and 'highlights', the passages
+            of each chunk that share terms with the query
         """
         # Generate query embedding
-        query_embedding = self.embedding_service.generate_embedding(query)
+        query_embedding = self._query_embedding(query)
         
         # Build filters
         filters = {}
@@ -68,7 +86,11 @@ class SearchService:
             index_name=self.index_name,
             query_embedding=query_embedding,
             size=size,
-            filters=filters if filters else None
+            filters=filters if filters else None,
+            source_includes=source_includes,
+            source_excludes=source_excludes,
+            highlight_text=query,
+            script_fields=script_fields
         )
         
         return results
@@ -106,6 +128,71 @@ class SearchService:
         
         return results
     
+    def search_both(self, query: str,
+                    size: int = 10,
+                    source: Optional[str] = None,
+                    section: Optional[str] = None) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Run semantic and keyword search for one query in a single request.
+        
+        Args:
+            query: Search query text
+            size: Number of results per search
+            source: Filter by source (rbi, income_tax, caqm)
+            section: Filter by section (Notifications, Circulars, etc.)
+            
+        Returns:
+            Tuple of (semantic results, keyword results)
+        """
+        # Build filters
+        filters = {}
+        if source:
+            filters["source"] = source
+        if section:
+            filters["section"] = section
+        
+        return self.es_setup.search_both(
+            index_name=self.index_name,
+            query_embedding=self._query_embedding(query),
+            query_text=query,
+            size=size,
+            filters=filters if filters else None
+        )
+    
+    def search_many(self, query: str,
+                    searches: List[Tuple[str, Optional[str], Optional[str]]],
+                    size: int = 10) -> List[List[Dict]]:
+        """
+        Run several searches for one query (e.g. one per source) in a single request.
+        
+        Args:
+            query: Search query text
+            searches: (search_type, source, section) triples; search_type is
+                'semantic' or 'keyword', source and section may be None
+            size: Number of results per search
+            
+        Returns:
+            One result list per search, in order
+        """
+        es_searches = []
+        for search_type, source, section in searches:
+            # Build filters
+            filters = {}
+            if source:
+                filters["source"] = source
+            if section:
+                filters["section"] = section
+            es_searches.append((search_type, filters if filters else None))
+        
+        needs_embedding = any(search_type == 'semantic' for search_type, _ in es_searches)
+        return self.es_setup.search_many(
+            index_name=self.index_name,
+            query_embedding=self._query_embedding(query) if needs_embedding else None,
+            query_text=query,
+            searches=es_searches,
+            size=size
+        )
+    
     def get_index_name(self) -> str:
         """Get the index name."""
         return self.index_name
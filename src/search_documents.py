@@ -8,8 +8,7 @@ import sys
 import argparse
 import logging
 from pathlib import Path
-from typing import Optional
-from collections import defaultdict
+from typing import List, Optional
 
 # Fix Windows console encoding for emojis
 if sys.platform == 'win32':
@@ -22,8 +21,9 @@ if sys.platform == 'win32':
 # Add src to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from search.es_setup import ElasticsearchSetup
+from search.es_setup import get_shared_setup
 from search.search_service import SearchService
+from search.faiss_backend import FaissSearchService
 from embeddings.embedding_service import EmbeddingService
 
 # Setup logging
@@ -34,8 +34,8 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def format_result(result: dict, index: int) -> str:
-    """Format a single search result for display."""
+def iter_result_lines(result: dict, index: int):
+    """Yield the display lines of a single search result."""
     title = result.get('title', 'Unknown Title')
     source = result.get('source', 'unknown').upper()
     score = result.get('score', 0)
@@ -54,41 +54,154 @@ def format_result(result: dict, index: int) -> str:
         preview = preview[:200] + "..."
     
     # Build formatted output
-    output = []
-    output.append(f"\n{'='*80}")
-    output.append(f"[{index}] {title}")
-    output.append(f"{'─'*80}")
-    output.append(f"Source: {source}  |  Section: {section}  |  Date: {date}  |  Relevance: {score_pct:.1f}%")
+    yield f"\n{'='*80}"
+    yield f"[{index}] {title}"
+    yield f"{'─'*80}"
+    yield f"Source: {source}  |  Section: {section}  |  Date: {date}  |  Relevance: {score_pct:.1f}%"
     if page:
-        output.append(f"Page: {page}  |  File: {filename}")
-    output.append(f"\nPreview:")
-    output.append(f"  {preview}")
-    output.append(f"{'='*80}")
-    
-    return "\n".join(output)
+        yield f"Page: {page}  |  File: {filename}"
+    yield f"\nPreview:"
+    yield f"  {preview}"
+    # Summary stored at index time (process_and_index --precompute-summaries)
+    if result.get('summary'):
+        yield f"\nSummary:"
+        yield f"  {result['summary']}"
+    yield f"{'='*80}"
+
+
+def format_result(result: dict, index: int) -> str:
+    """Format a single search result for display."""
+    return "\n".join(iter_result_lines(result, index))
 
 
 def deduplicate_results(results: list, top_per_doc: int = 1) -> list:
     """Deduplicate results - keep only the top chunk per document."""
-    doc_results = defaultdict(list)
-    
+    # One pass keeping each document's best chunk (the first one on ties)
+    best = {}
     for result in results:
         doc_id = result.get('doc_id', '')
-        doc_results[doc_id].append(result)
-    
-    # For each document, keep only the highest scoring chunk
-    deduplicated = []
-    for doc_id, chunks in doc_results.items():
-        # Sort by score and take top chunk
-        sorted_chunks = sorted(chunks, key=lambda x: x.get('score', 0), reverse=True)
-        deduplicated.append(sorted_chunks[0])
+        score = result.get('score', 0)
+        current = best.get(doc_id)
+        if current is None or score > current[0]:
+            best[doc_id] = (score, result)
     
     # Re-sort all deduplicated results by score
+    deduplicated = [result for _, result in best.values()]
     deduplicated.sort(key=lambda x: x.get('score', 0), reverse=True)
     
     return deduplicated
 
 
+def _build_services(es_host: str = 'localhost',
+                    es_port: int = 9200,
+                    es_username: Optional[str] = None,
+                    es_password: Optional[str] = None,
+                    faiss_dir: Optional[str] = None):
+    """
+    Connect to Elasticsearch (or load a FAISS index) and the embedding model.
+    
+    Args:
+        faiss_dir: Directory of an exported FAISS index; when given, searches
+            run locally and es_setup is None
+    
+    Returns:
+        Tuple of (es_setup, embedding_service, search_service)
+    """
+    if faiss_dir:
+        embedding_service = EmbeddingService()
+        return None, embedding_service, FaissSearchService(embedding_service, index_dir=faiss_dir)
+    
+    # The ES client is shared across calls in this process
+    es_setup = get_shared_setup(
+        host=es_host,
+        port=es_port,
+        username=es_username,
+        password=es_password
+    )
+    
+    embedding_service = EmbeddingService()
+    search_service = SearchService(
+        es_setup=es_setup,
+        embedding_service=embedding_service,
+        index_name='government_documents'
+    )
+    return es_setup, embedding_service, search_service
+
+
+def _run_search(search_service: SearchService,
+                query: str,
+                size: int = 10,
+                source: Optional[str] = None,
+                section: Optional[str] = None,
+                deduplicate: bool = True,
+                search_type: str = 'semantic') -> list:
+    """Run one search on already-built services and return the results to show."""
+    # Perform search (get more results if deduplicating)
+    search_size = size * 3 if deduplicate else size
+    
+    if search_type == 'semantic':
+        results = search_service.search(
+            query=query,
+            size=search_size,
+            source=source,
+            section=section
+        )
+    else:  # keyword search
+        results = search_service.keyword_search(
+            query=query,
+            size=search_size,
+            source=source,
+            section=section
+        )
+    
+    return _trim_results(results, size, deduplicate)
+
+
+def _trim_results(results: list, size: int, deduplicate: bool) -> list:
+    """Deduplicate results if requested and cut them to size."""
+    if results and deduplicate:
+        results = deduplicate_results(results, top_per_doc=1)
+        results = results[:size]  # Limit to requested size after deduplication
+    return results
+
+
+def _search_header_lines(query: str, search_type: str,
+                         source: Optional[str] = None,
+                         section: Optional[str] = None):
+    """Yield the lines describing what is being searched for."""
+    search_type_label = "Semantic (Vector-based)" if search_type == 'semantic' else "Keyword (BM25)"
+    yield f"\n🔍 Searching for: '{query}'"
+    yield f"   Search type: {search_type_label}"
+    if source:
+        yield f"   Filter: Source = {source}"
+    if section:
+        yield f"   Filter: Section = {section}"
+    yield ""
+
+
+def _results_lines(results: list):
+    """Yield the lines of a result listing, or hints when there are none."""
+    if not results:
+        yield "❌ No results found."
+        yield "\nTry:"
+        yield "  - Broadening your search terms"
+        yield "  - Removing filters"
+        yield "  - Checking spelling"
+        return
+    
+    yield f"✅ Found {len(results)} result(s):\n"
+    
+    for i, result in enumerate(results, 1):
+        yield from iter_result_lines(result, i)
+    
+    yield f"\n📊 Summary: {len(results)} document(s) found"
+
+
+def _write_lines(lines):
+    """Write lines to stdout in one call rather than a print per line."""
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
 def search_documents(query: str,
                     size: int = 10,
                     source: Optional[str] = None,
@@ -98,7 +211,8 @@ def search_documents(query: str,
                     es_host: str = 'localhost',
                     es_port: int = 9200,
                     es_username: Optional[str] = None,
-                    es_password: Optional[str] = None):
+                    es_password: Optional[str] = None,
+                    faiss_dir: Optional[str] = None):
     """
     Search documents and display results.
     
@@ -112,70 +226,65 @@ def search_documents(query: str,
         es_port: Elasticsearch port
         es_username: Elasticsearch username
         es_password: Elasticsearch password
+        faiss_dir: Search this exported FAISS index instead of Elasticsearch
     """
-    search_type_label = "Semantic (Vector-based)" if search_type == 'semantic' else "Keyword (BM25)"
-    print(f"\n🔍 Searching for: '{query}'")
-    print(f"   Search type: {search_type_label}")
-    if source:
-        print(f"   Filter: Source = {source}")
-    if section:
-        print(f"   Filter: Section = {section}")
-    print()
+    # Shown before the search so there is feedback while it runs
+    _write_lines(_search_header_lines(query, search_type, source, section))
     
     try:
-        # Initialize services
-        es_setup = ElasticsearchSetup(
-            host=es_host,
-            port=es_port,
-            username=es_username,
-            password=es_password
-        )
-        
-        embedding_service = EmbeddingService()
-        search_service = SearchService(
-            es_setup=es_setup,
-            embedding_service=embedding_service,
-            index_name='government_documents'
-        )
+        _, _, search_service = _build_services(es_host, es_port, es_username, es_password, faiss_dir)
+        results = _run_search(search_service, query, size, source, section, deduplicate, search_type)
+        _write_lines(_results_lines(results))
         
-        # Perform search (get more results if deduplicating)
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Search interrupted by user.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        logger.error("Search failed", exc_info=True)
+        sys.exit(1)
+
+
+def search_multiple(query: str,
+                    search_types: List[str],
+                    sources: List[Optional[str]],
+                    size: int = 10,
+                    section: Optional[str] = None,
+                    deduplicate: bool = True,
+                    es_host: str = 'localhost',
+                    es_port: int = 9200,
+                    es_username: Optional[str] = None,
+                    es_password: Optional[str] = None,
+                    faiss_dir: Optional[str] = None):
+    """
+    Run every combination of search type and source filter and display them.
+    
+    Services are built once, and all searches go out in one _msearch
+    request that Elasticsearch runs concurrently.
+    
+    Args:
+        query: Search query string
+        search_types: 'semantic' and/or 'keyword'
+        sources: Source filters to search separately (None for all sources)
+        Others: Same as search_documents
+    """
+    try:
+        _, _, search_service = _build_services(es_host, es_port, es_username, es_password, faiss_dir)
+        searches = [(search_type, source, section) for search_type in search_types for source in sources]
         search_size = size * 3 if deduplicate else size
+        all_results = search_service.search_many(query=query, searches=searches, size=search_size)
         
-        if search_type == 'semantic':
-            results = search_service.search(
-                query=query,
-                size=search_size,
-                source=source,
-                section=section
-            )
-        else:  # keyword search
-            results = search_service.keyword_search(
-                query=query,
-                size=search_size,
-                source=source,
-                section=section
-            )
-        
-        if not results:
-            print("❌ No results found.")
-            print("\nTry:")
-            print("  - Broadening your search terms")
-            print("  - Removing filters")
-            print("  - Checking spelling")
-            return
-        
-        # Deduplicate if requested
-        if deduplicate:
-            results = deduplicate_results(results, top_per_doc=1)
-            results = results[:size]  # Limit to requested size after deduplication
-        
-        # Display results
-        print(f"✅ Found {len(results)} result(s):\n")
-        
-        for i, result in enumerate(results, 1):
-            print(format_result(result, i))
-        
-        print(f"\n📊 Summary: {len(results)} document(s) found")
+        # All listings go out in a single write
+        banner = "=" * 80
+        lines = []
+        results_iter = iter(all_results)
+        for i, search_type in enumerate(search_types):
+            if len(search_types) > 1:
+                lines.extend([("\n" if i else "") + banner, f"{search_type.upper()} SEARCH RESULTS", banner])
+            for source in sources:
+                lines.extend(_search_header_lines(query, search_type, source, section))
+                lines.extend(_results_lines(_trim_results(next(results_iter), size, deduplicate)))
+        _write_lines(lines)
         
     except KeyboardInterrupt:
         print("\n\n⚠️  Search interrupted by user.")
@@ -199,6 +308,9 @@ Examples:
   # Search with source filter
   python src/search_documents.py "banking regulations" --source rbi
   
+  # Top results from each of several sources, fetched in one request
+  python src/search_documents.py "air quality" --source caqm income_tax
+  
   # Search with section filter
   python src/search_documents.py "tax rules" --section Circulars
   
@@ -207,6 +319,9 @@ Examples:
   
   # Show all chunks (no deduplication)
   python src/search_documents.py "monetary policy" --no-deduplicate
+  
+  # Semantic search on a local FAISS index (export it with process_and_index.py --export-faiss)
+  python src/search_documents.py "repo rate" --backend faiss
         """
     )
     
@@ -226,8 +341,10 @@ Examples:
     parser.add_argument(
         '--source',
         type=str,
+        nargs='+',
         choices=['rbi', 'income_tax', 'caqm'],
-        help='Filter by source: rbi, income_tax, or caqm'
+        help='Filter by source: rbi, income_tax, or caqm; give several to see '
+             'each source\'s results separately'
     )
     
     parser.add_argument(
@@ -278,58 +395,62 @@ Examples:
         help='Elasticsearch password'
     )
     
+    parser.add_argument(
+        '--backend',
+        type=str,
+        choices=['elasticsearch', 'faiss'],
+        default='elasticsearch',
+        help='Where to run the search: elasticsearch, or faiss for a local index '
+             'exported from it (semantic search only; default: elasticsearch)'
+    )
+    
+    parser.add_argument(
+        '--faiss-dir',
+        type=str,
+        default='faiss_index',
+        help='Directory of the exported FAISS index (default: faiss_index)'
+    )
+    
     args = parser.parse_args()
     
-    # Handle 'both' search type
-    if args.search_type == 'both':
-        # Run semantic search
-        print("=" * 80)
-        print("SEMANTIC SEARCH RESULTS")
-        print("=" * 80)
-        search_documents(
-            query=args.query,
-            size=args.size,
-            source=args.source,
-            section=args.section,
-            deduplicate=not args.no_deduplicate,
-            search_type='semantic',
-            es_host=args.es_host,
-            es_port=args.es_port,
-            es_username=args.es_username,
-            es_password=args.es_password
-        )
-        print("\n" + "=" * 80)
-        print("KEYWORD SEARCH RESULTS")
-        print("=" * 80)
-        # Run keyword search
-        search_documents(
+    if args.backend == 'faiss' and args.search_type != 'semantic':
+        parser.error("--backend faiss only supports --search-type semantic")
+    faiss_dir = args.faiss_dir if args.backend == 'faiss' else None
+    
+    search_types = ['semantic', 'keyword'] if args.search_type == 'both' else [args.search_type]
+    sources = args.source or [None]
+    
+    if len(search_types) > 1 or len(sources) > 1:
+        # 'both' and/or several sources: one request for every combination
+        search_multiple(
             query=args.query,
+            search_types=search_types,
+            sources=sources,
             size=args.size,
-            source=args.source,
             section=args.section,
             deduplicate=not args.no_deduplicate,
-            search_type='keyword',
             es_host=args.es_host,
             es_port=args.es_port,
             es_username=args.es_username,
-            es_password=args.es_password
+            es_password=args.es_password,
+            faiss_dir=faiss_dir
         )
     else:
         # Run single search type
         search_documents(
             query=args.query,
             size=args.size,
-            source=args.source,
+            source=sources[0],
             section=args.section,
             deduplicate=not args.no_deduplicate,
             search_type=args.search_type,
             es_host=args.es_host,
             es_port=args.es_port,
             es_username=args.es_username,
-            es_password=args.es_password
+            es_password=args.es_password,
+            faiss_dir=faiss_dir
         )
 
-
 if __name__ == "__main__":
     main()
 
@@ -5,6 +5,8 @@ Uses sentence embeddings to find the most representative sentences.
 
 import re
 import logging
+from functools import lru_cache
+from itertools import islice
 from typing import List, Dict, Optional
 from collections import Counter
 
@@ -24,6 +26,36 @@ except ImportError:
     logger.warning("sentence-transformers not available. Summarization will be limited.")
 
 
+# Sentence boundary: a run of terminal punctuation followed by whitespace
+_SENT_SPLIT = re.compile(r'[.!?]+\s+')
+
+# Candidate sentences read from a search result: enough to choose a summary
+# from, without splitting and encoding the whole of a long document
+MIN_CANDIDATE_SENTENCES = 30
+
+# Fewest sentences an indexed chunk (~500 words) is assumed to hold; sizes the
+# fetch of leading chunks when a whole document is summarized
+MIN_SENTENCES_PER_CHUNK = 10
+
+
+def _iter_pieces(text: str):
+    """Yield the text between sentence boundaries, one piece at a time."""
+    start = 0
+    for match in _SENT_SPLIT.finditer(text):
+        yield text[start:match.start()]
+        start = match.end()
+    yield text[start:]
+
+
+@lru_cache(maxsize=4)
+def _load_model(model_name: str):
+    """Load a sentence transformer once per process; later summarizers reuse it."""
+    logger.info(f"Loading summarization model: {model_name}")
+    model = SentenceTransformer(model_name)
+    logger.info("Summarization model loaded successfully")
+    return model
+
+
 class DocumentSummarizer:
     """Extractive document summarization using sentence embeddings."""
     
@@ -39,26 +71,99 @@ class DocumentSummarizer:
         
         if SENTENCE_TRANSFORMERS_AVAILABLE:
             try:
-                logger.info(f"Loading summarization model: {model_name}")
-                self.model = SentenceTransformer(model_name)
-                logger.info("Summarization model loaded successfully")
+                self.model = _load_model(model_name)
             except Exception as e:
                 logger.warning(f"Failed to load model {model_name}: {e}")
                 self.model = None
         else:
             logger.warning("Sentence transformers not available. Using fallback summarization.")
     
-    def split_into_sentences(self, text: str) -> List[str]:
-        """Split text into sentences."""
+    def split_into_sentences(self, text: str, max_sentences: Optional[int] = None) -> List[str]:
+        """
+        Split text into sentences.
+        
+        Args:
+            text: Text to split
+            max_sentences: Stop after this many sentences instead of splitting
+                the whole text
+            
+        Returns:
+            Sentences longer than 20 characters, in order
+        """
         if not text:
             return []
         
-        # Split by sentence-ending punctuation
-        sentences = re.split(r'[.!?]+\s+', text)
-        # Filter out very short sentences (likely artifacts)
-        sentences = [s.strip() for s in sentences if len(s.strip()) > 20]
+        if max_sentences is None:
+            pieces = _SENT_SPLIT.split(text)
+        else:
+            # Walk the boundaries lazily so a long text is only scanned as far
+            # as the sentences actually used
+            pieces = _iter_pieces(text)
+        
+        # Strip each piece once; filter out very short sentences (likely artifacts)
+        sentences = (s for s in map(str.strip, pieces) if len(s) > 20)
+        return list(islice(sentences, max_sentences))
+    
+    def _prepare_sentences(self, text: str, num_sentences: int,
+                           max_sentences: Optional[int] = None):
+        """
+        Split text for ranking, keeping at most max_sentences candidates.
+        
+        Returns:
+            (summary, None) when no ranking is needed (too little text, few
+            enough sentences, or no model), otherwise (None, sentences)
+        """
+        if not text or len(text.strip()) < 50:
+            return (text[:200] if text else "No text available for summarization."), None
+        
+        # Split into sentences
+        sentences = self.split_into_sentences(text, max_sentences)
+        
+        if len(sentences) <= num_sentences:
+            # Document is already short enough
+            return ' '.join(sentences), None
+        
+        if not self.model or not NUMPY_AVAILABLE:
+            # Fallback: return first N sentences
+            return ' '.join(sentences[:num_sentences]), None
         
-        return sentences
+        return None, sentences
+    
+    def _encode(self, texts: List[str]):
+        """
+        Encode texts in one model call as a (len(texts), D) float32 array.
+        Vectors come back unit length (as EmbeddingService's do), so cosine
+        similarity is a plain dot product.
+        """
+        embeddings = self.model.encode(
+            texts, batch_size=64, show_progress_bar=False, convert_to_numpy=True, normalize_embeddings=True
+        )
+        return np.asarray(embeddings, dtype=np.float32)
+    
+    @staticmethod
+    def _select_sentences(sentences: List[str], sentence_embeddings, num_sentences: int,
+                          query_embedding=None) -> str:
+        """Join the num_sentences best-scoring sentences, in document order."""
+        # Scores stay float32: numpy has no BLAS kernel for integer matmul, so
+        # int8-quantized embeddings would rank several times slower here
+        if query_embedding is not None:
+            # Bias towards query-relevant sentences: cosine similarity of every
+            # sentence in one matrix-vector product, highest first
+            scores = -(sentence_embeddings @ query_embedding)
+        else:
+            # Select diverse, representative sentences
+            # Simple approach: use centroid of all sentences, pick closest to centroid.
+            # For unit vectors |e - c|^2 = 1 + |c|^2 - 2 e.c, so the closest
+            # sentences are those with the largest dot product with the centroid
+            centroid = sentence_embeddings.mean(axis=0)
+            scores = -(sentence_embeddings @ centroid)
+        
+        # Lowest scores win; partitioning finds them without sorting all N
+        selected_indices = np.argpartition(scores, num_sentences)[:num_sentences]
+        selected_indices = sorted(selected_indices.tolist())  # Maintain original order
+        
+        # Build summary from selected sentences
+        return ' '.join(sentences[i] for i in selected_indices)
     
     def summarize_extractive(self, 
                             text: str, 
@@ -75,74 +180,76 @@ class DocumentSummarizer:
         Returns:
             Summary text
         """
-        if not text or len(text.strip()) < 50:
-            return text[:200] if text else "No text available for summarization."
-        
-        # Split into sentences
-        sentences = self.split_into_sentences(text)
-        
-        if len(sentences) <= num_sentences:
-            # Document is already short enough
-            return ' '.join(sentences)
-        
-        if not self.model:
-            # Fallback: return first N sentences
-            return ' '.join(sentences[:num_sentences])
-        
-        try:
-            # Generate embeddings for all sentences
-            sentence_embeddings = self.model.encode(sentences, show_progress_bar=False)
-            
-            if query and NUMPY_AVAILABLE:
-                # If query provided, bias towards query-relevant sentences
-                query_embedding = self.model.encode([query], show_progress_bar=False)[0]
-                
-                # Calculate similarity to query using cosine similarity
-                similarities = []
-                query_norm = np.linalg.norm(query_embedding)
-                for sent_emb in sentence_embeddings:
-                    sent_norm = np.linalg.norm(sent_emb)
-                    if sent_norm > 0 and query_norm > 0:
-                        similarity = np.dot(sent_emb, query_embedding) / (sent_norm * query_norm)
-                        similarities.append(similarity)
-                    else:
-                        similarities.append(0.0)
-                
-                # Select top sentences by query relevance
-                sentence_scores = list(enumerate(similarities))
-                sentence_scores.sort(key=lambda x: x[1], reverse=True)
-                selected_indices = [idx for idx, _ in sentence_scores[:num_sentences]]
-                selected_indices.sort()  # Maintain original order
-                
-            else:
-                # Select diverse, representative sentences
-                # Simple approach: use centroid of all sentences, pick closest to centroid
-                if NUMPY_AVAILABLE:
-                    centroid = np.mean(sentence_embeddings, axis=0)
-                    distances = [
-                        np.linalg.norm(emb - centroid) for emb in sentence_embeddings
-                    ]
-                else:
-                    # Fallback: just pick first N sentences
-                    distances = list(range(len(sentence_embeddings)))
-                
-                # Pick sentences closest to centroid (most representative)
-                sentence_scores = list(enumerate(distances))
-                sentence_scores.sort(key=lambda x: x[1])  # Sort by distance (ascending)
-                selected_indices = [idx for idx, _ in sentence_scores[:num_sentences]]
-                selected_indices.sort()  # Maintain original order
-            
-            # Build summary from selected sentences
-            summary_sentences = [sentences[i] for i in selected_indices]
-            summary = ' '.join(summary_sentences)
-            
+        summary, sentences = self._prepare_sentences(text, num_sentences)
+        if summary is not None:
             return summary
+        return self._summarize_sentences(sentences, num_sentences, query)
+    
+    def _summarize_sentences(self, sentences: List[str], num_sentences: int,
+                             query: Optional[str] = None) -> str:
+        """Rank already-split sentences and join the best num_sentences."""
+        try:
+            # Sentences and query go through the model together
+            embeddings = self._encode(sentences + [query] if query else sentences)
+            query_embedding = embeddings[-1] if query else None
+            return self._select_sentences(sentences, embeddings[:len(sentences)], num_sentences, query_embedding)
             
         except Exception as e:
             logger.error(f"Error generating summary: {e}")
             # Fallback: return first N sentences
             return ' '.join(sentences[:num_sentences])
     
+    @staticmethod
+    def _document_text(document: Dict) -> str:
+        """Text to summarize for a search result."""
+        # Use full_text if available (older indices), otherwise use text_chunk
+        return document.get('full_text', '') or document.get('text_chunk', '')
+    
+    @staticmethod
+    def _candidate_limit(num_sentences: int) -> int:
+        """Sentences of a search result to consider for a summary of num_sentences."""
+        return max(MIN_CANDIDATE_SENTENCES, num_sentences * 10)
+    
+    @classmethod
+    def leading_chunk_count(cls, num_sentences: int) -> int:
+        """Leading chunks of a document that cover its candidate sentences."""
+        return -(-cls._candidate_limit(num_sentences) // MIN_SENTENCES_PER_CHUNK)
+    
+    @staticmethod
+    def join_chunks(chunks: List[str]) -> str:
+        """
+        Rebuild document text from consecutive chunks, in chunk_id order.
+        
+        Indexed chunks overlap, each one opening with the tail of the one
+        before; that repeated span is dropped so no sentence appears twice.
+        
+        Args:
+            chunks: Chunk texts in order
+            
+        Returns:
+            The joined text
+        """
+        parts = []
+        prev = ''
+        for chunk in chunks:
+            overlap = 0
+            if prev and chunk:
+                # Longest suffix of the previous chunk that this chunk starts with
+                probe = chunk[:64]
+                pos = prev.find(probe)
+                while pos != -1:
+                    if chunk.startswith(prev[pos:]):
+                        overlap = len(prev) - pos
+                        break
+                    pos = prev.find(probe, pos + 1)
+            if overlap:
+                # What follows the overlap keeps its own leading space
+                parts.append(chunk[overlap:])
+            elif chunk:
+                parts.append(' ' + chunk if parts else chunk)
+            prev = chunk
+        return ''.join(parts).strip()
+    
     def summarize_document(self, 
                           document: Dict,
                           num_sentences: int = 3,
@@ -151,24 +258,26 @@ class DocumentSummarizer:
         Summarize a document from search results.
         
         Args:
-            document: Document dictionary with 'full_text' or 'text_chunk'
+            document: Document dictionary with 'text_chunk' (or legacy 'full_text')
             num_sentences: Number of sentences in summary
             query: Optional query to guide summarization
             
         Returns:
             Summary text
         """
-        # Use full_text if available, otherwise use text_chunk
-        text = document.get('full_text', '') or document.get('text_chunk', '')
+        text = self._document_text(document)
         
         if not text:
             return "No text available for summarization."
         
-        # Limit text length for summarization (process max 5000 chars for speed)
-        if len(text) > 5000:
-            text = text[:5000] + "..."
-        
-        return self.summarize_extractive(text, num_sentences, query)
+        # Only the leading sentences are candidates, which bounds the work on
+        # long documents without cutting a sentence in half
+        summary, sentences = self._prepare_sentences(
+            text, num_sentences, self._candidate_limit(num_sentences)
+        )
+        if summary is not None:
+            return summary
+        return self._summarize_sentences(sentences, num_sentences, query)
     
     def summarize_search_results(self,
                                 results: List[Dict],
@@ -177,6 +286,11 @@ class DocumentSummarizer:
         """
         Add summaries to search results.
         
+        Results that came back with Elasticsearch 'highlights' are summarized
+        from those passages without touching the model. Sentences from every
+        other result that needs ranking are encoded in a single model call
+        (with the query), then each result's rows are scored on their own.
+        
         Args:
             results: List of search result dictionaries
             num_sentences_per_doc: Sentences per summary
@@ -185,13 +299,49 @@ class DocumentSummarizer:
         Returns:
             Results with added 'summary' field
         """
+        # (result, sentences) for results whose summary needs the model
+        pending = []
         for result in results:
-            if 'summary' not in result:
-                result['summary'] = self.summarize_document(
-                    result,
-                    num_sentences=num_sentences_per_doc,
-                    query=query
+            if 'summary' in result:
+                continue
+            highlights = result.get('highlights')
+            if highlights:
+                # Passages Elasticsearch already picked around the query terms
+                result['summary'] = ' '.join(highlights[:num_sentences_per_doc])
+                continue
+            text = self._document_text(result)
+            if not text:
+                result['summary'] = "No text available for summarization."
+                continue
+            summary, sentences = self._prepare_sentences(
+                text, num_sentences_per_doc, self._candidate_limit(num_sentences_per_doc)
+            )
+            if summary is not None:
+                result['summary'] = summary
+            else:
+                pending.append((result, sentences))
+        
+        if not pending:
+            return results
+        
+        flat = [sentence for _, sentences in pending for sentence in sentences]
+        try:
+            embeddings = self._encode(flat + [query] if query else flat)
+        except Exception as e:
+            logger.error(f"Error generating summary: {e}")
+            embeddings = None
+        query_embedding = embeddings[-1] if query and embeddings is not None else None
+        
+        offset = 0
+        for result, sentences in pending:
+            end = offset + len(sentences)
+            if embeddings is None:
+                # Fallback: return first N sentences
+                result['summary'] = ' '.join(sentences[:num_sentences_per_doc])
+            else:
+                result['summary'] = self._select_sentences(
+                    sentences, embeddings[offset:end], num_sentences_per_doc, query_embedding
                 )
+            offset = end
         
         return results
-
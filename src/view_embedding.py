@@ -8,16 +8,18 @@ import sys
 import os
 import json
 
+import numpy as np
+
 # Add src to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from search import ElasticsearchSetup
+from search import get_shared_setup
 
 def view_embedding(doc_id: str = None, chunk_id: int = None, es_password: str = None):
     """View embedding for a single document/chunk."""
     
-    # Connect to Elasticsearch
-    es_setup = ElasticsearchSetup(
+    # Connect to Elasticsearch (reused across calls in this process)
+    es_setup = get_shared_setup(
         host="localhost",
         port=9200,
         username="elastic",
@@ -74,16 +76,21 @@ def view_embedding(doc_id: str = None, chunk_id: int = None, es_password: str =
     # Show first 20 values, then summary
     print(f"\nFirst 20 values: {embedding[:20]}")
     print(f"\nLast 10 values: {embedding[-10:]}")
+    # One array for all the stats instead of a Python pass per statistic
+    vector = np.asarray(embedding, dtype=np.float64)
     print(f"\nVector stats:")
-    print(f"  - Min value: {min(embedding):.6f}")
-    print(f"  - Max value: {max(embedding):.6f}")
-    print(f"  - Mean: {sum(embedding)/len(embedding):.6f}")
+    print(f"  - Min value: {vector.min():.6f}")
+    print(f"  - Max value: {vector.max():.6f}")
+    print(f"  - Mean: {vector.mean():.6f}")
+    print(f"  - Std dev: {vector.std():.6f}")
     
     # Show full vector in compact format
     print(f"\n{'=' * 80}")
     print("📋 FULL VECTOR (comma-separated):")
     print("-" * 80)
-    print(json.dumps(embedding, indent=2)[:500] + "..." if len(json.dumps(embedding)) > 500 else json.dumps(embedding, indent=2))
+    # Dumped once; the length check uses the same string that is printed
+    vector_json = json.dumps(embedding, indent=2)
+    print(vector_json[:500] + "..." if len(vector_json) > 500 else vector_json)
     
     # Text preview
     text_preview = source.get('text_chunk', '')[:200]
@@ -3,57 +3,141 @@
 
 import sys
 import os
-sys.path.insert(0, 'src')
 
 # Fix Windows encoding
 if sys.platform == 'win32':
     import io
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
-from search import ElasticsearchSetup
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 
-def test_password(password=None):
+from elasticsearch import ApiError, Elasticsearch
+from elasticsearch import ConnectionError as ESConnectionError, ConnectionTimeout
+
+# Transient failures (server starting up) are retried with jittered
+# exponential backoff so they are not reported as a wrong password
+MAX_ATTEMPTS = 3
+MAX_BACKOFF = 8.0
+
+@lru_cache(maxsize=None)
+def get_client(host="localhost", port=9200):
+    """One client (and connection pool) for every attempt; only the auth header changes."""
+    # Retries are done in _with_retry, with backoff
+    return Elasticsearch(f"http://{host}:{port}", request_timeout=10, max_retries=0)
+
+def _is_transient(error):
+    if isinstance(error, (ESConnectionError, ConnectionTimeout)):
+        return True
+    return isinstance(error, ApiError) and error.meta.status == 503
+
+def _with_retry(call):
+    """call(), retrying connection errors and 503s; a 401 fails at once."""
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            return call()
+        except Exception as e:
+            if attempt == MAX_ATTEMPTS - 1 or not _is_transient(e):
+                raise
+            time.sleep(random.uniform(0, min(MAX_BACKOFF, 0.5 * 2 ** attempt)))
+
+def _authenticate(es_client):
+    """Cheapest credential check: a HEAD answers 200/401 with no body to read."""
+    try:
+        es_client.perform_request("HEAD", "/_security/_authenticate")
+    except ApiError as e:
+        if e.meta.status in (401, 403, 429, 503):
+            raise
+        # Security disabled: the endpoint errors, but a plain request works
+        es_client.info()
+
+# Probes run in parallel; keep each one's report together, and drop reports
+# from probes still finishing once a winner has been announced
+_print_lock = threading.Lock()
+_settled = threading.Event()
+
+def _report(*lines):
+    with _print_lock:
+        if not _settled.is_set():
+            print("\n".join(lines))
+
+# Circuit breaker: a 429 means the server (or a proxy) is rate limiting
+# logins, so probing stops at the first one
+_rate_limited = threading.Event()
+
+def _record_failure(error):
+    if isinstance(error, ApiError) and error.meta.status == 429:
+        _rate_limited.set()
+
+def test_password(password=None, es_client=None):
     """Test if password works."""
+    if _rate_limited.is_set():
+        return False
     try:
-        es = ElasticsearchSetup(
-            host="localhost",
-            port=9200,
-            username="elastic",
-            password=password
-        )
-        es_client = es.get_client()
-        info = es_client.info()
-        print(f"✅ SUCCESS! Elasticsearch is running")
-        print(f"   Version: {info.get('version', {}).get('number', 'unknown')}")
+        es_client = es_client or get_client()
         if password:
-            print(f"   Password: {password} (works!)")
-        else:
-            print(f"   No password required!")
+            es_client = es_client.options(basic_auth=("elastic", password))
+        _with_retry(lambda: _authenticate(es_client))
+        # Only a working credential gets the full cluster info for the banner
+        info = es_client.info()
+        _report(
+            f"✅ SUCCESS! Elasticsearch is running",
+            f"   Version: {info.get('version', {}).get('number', 'unknown')}",
+            f"   Password: {password} (works!)" if password else f"   No password required!"
+        )
         return True
     except Exception as e:
-        if password:
-            print(f"❌ Password '{password}' doesn't work")
+        _record_failure(e)
+        if _rate_limited.is_set():
+            _report(f"❌ Rate limited (HTTP 429) checking {repr(password) if password else 'no password'}")
+        elif password and _is_transient(e):
+            _report(f"❌ Could not check password '{password}': {str(e)[:100]}")
+        elif password:
+            _report(f"❌ Password '{password}' doesn't work")
         else:
-            print(f"❌ No password connection failed: {str(e)[:100]}")
+            _report(f"❌ No password connection failed: {str(e)[:100]}")
         return False
 
-if __name__ == "__main__":
+def main():
     print("Testing Elasticsearch connection...\n")
     
-    # Test 1: No password
-    print("1. Testing without password...")
-    if test_password(None):
-        print("\n✅ Your Elasticsearch doesn't require a password!")
-        sys.exit(0)
-    
-    # Test 2: Common default passwords
-    common_passwords = ["elastic", "changeme", ""]
+    # No password first, then common defaults ("" sends no credentials either,
+    # so it is the same probe as no password)
+    candidates = [None, "elastic", "changeme"]
     
-    print("\n2. Testing common passwords...")
-    for pwd in common_passwords:
-        if test_password(pwd):
+    print("Testing without a password and with common passwords at once...")
+    # The probes are independent, so they race on the shared client's
+    # connection pool; the wait is the first success, not the sum of them
+    executor = ThreadPoolExecutor(max_workers=len(candidates))
+    futures = {executor.submit(test_password, pwd): pwd for pwd in candidates}
+    no_password = next(f for f, pwd in futures.items() if pwd is None)
+    for future in as_completed(futures):
+        pwd = futures[future]
+        if not future.result():
+            if _rate_limited.is_set():
+                executor.shutdown(wait=False, cancel_futures=True)
+                with _print_lock:
+                    _settled.set()
+                print("\n❌ Elasticsearch is rate limiting login attempts; stopped probing.")
+                print("   Wait a while before trying again.")
+                sys.exit(1)
+            continue
+        # With security off any credentials are accepted, so a password only
+        # wins once the no-password probe has failed
+        if pwd is not None and no_password.result():
+            continue
+        executor.shutdown(wait=False, cancel_futures=True)
+        with _print_lock:
+            _settled.set()
+        if pwd is None:
+            print("\n✅ Your Elasticsearch doesn't require a password!")
+        else:
             print(f"\n✅ Found working password: '{pwd}'")
-            sys.exit(0)
+        sys.exit(0)
+    executor.shutdown()
     
     print("\n❌ None of the common passwords worked.")
     print("\n💡 Your password might be:")
@@ -62,3 +146,5 @@ if __name__ == "__main__":
     print("   - Check: C:\\elasticsearch\\elasticsearch-8.17.4\\config\\elasticsearch.yml")
     print("\n💡 Try running: python quick_embedding.py YOUR_PASSWORD")
 
+if __name__ == "__main__":
+    main()
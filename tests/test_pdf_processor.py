@@ -0,0 +1,89 @@
+"""
+Tests for the chunk boundary kernel in processors.pdf_processor.
+"""
+
+import os
+import random
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from processors.pdf_processor import _chunk_bounds
+
+
+def reference_bounds(text, chunk_chars, overlap_chars, min_words):
+    """Same boundary walk as _chunk_bounds, counting words with str.split()."""
+    text_len = len(text)
+    bounds = []
+    start = 0
+    while start < text_len:
+        end = min(start + chunk_chars, text_len)
+        if end < text_len:
+            back = max(text.rfind(' ', start, end), text.rfind('\n', start, end))
+            ahead = [i for i in (text.find(' ', end), text.find('\n', end)) if i != -1]
+            if back > max(start, end - 200):
+                end = back + 1
+            elif ahead and min(ahead) < min(end + 100, text_len):
+                end = min(ahead) + 1
+
+        chunk_text = text[start:end].strip()
+        if chunk_text and len(chunk_text.split()) < min_words and end < text_len:
+            ahead = [i for i in (text.find(' ', end), text.find('\n', end)) if i != -1]
+            if ahead and min(ahead) < min(end + chunk_chars, text_len):
+                end = min(ahead) + 1
+
+        bounds.append((start, end))
+        if end >= text_len:
+            break
+
+        overlap_start = max(start, end - overlap_chars)
+        if overlap_start < end:
+            ahead = [i for i in (text.find(' ', overlap_start), text.find('\n', overlap_start)) if i != -1]
+            if ahead and min(ahead) < min(overlap_start + 200, text_len, end):
+                start = min(ahead) + 1
+            else:
+                start = overlap_start
+        else:
+            start = end
+
+        if start >= end:
+            start = end + 1
+            if start >= text_len:
+                break
+    return bounds
+
+
+def kernel_bounds(text, chunk_chars, overlap_chars, min_words):
+    """Build the indices the way split_into_chunks does and run the kernel."""
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    breaks = np.flatnonzero((codes == 0x20) | (codes == 0x0A)).astype(np.int64)
+    is_space = (codes == 0x20) | ((codes >= 0x09) & (codes <= 0x0D))
+    prev_space = np.concatenate(([True], is_space[:-1]))
+    word_starts = np.flatnonzero(~is_space & prev_space).astype(np.int64)
+    bounds = _chunk_bounds(breaks, word_starts, is_space, len(text), chunk_chars,
+                           overlap_chars, min_words)
+    return [tuple(pair) for pair in bounds.tolist()]
+
+
+class TestChunkBounds(unittest.TestCase):
+
+    def test_matches_split_word_count(self):
+        """Kernel bounds equal a split()-counted walk on cleaned text."""
+        rng = random.Random(0)
+        for _ in range(400):
+            # Cleaned text: single spaces, words long enough that overlaps
+            # regularly start mid-word
+            words = [''.join(rng.choice('abcdefghij') for _ in range(rng.randint(1, 40)))
+                     for _ in range(rng.randint(50, 400))]
+            text = ' '.join(words)
+            chunk_size = rng.randint(10, 60)
+            overlap = rng.randint(0, chunk_size // 2)
+            args = (chunk_size * 6, overlap * 6, chunk_size * 0.5)
+            self.assertEqual(kernel_bounds(text, *args), reference_bounds(text, *args))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
 """Simple script to verify Elasticsearch is running and accessible."""
 
+import json
+import os
+import socket
 import sys
+import time
 
 try:
     import requests
@@ -11,24 +15,121 @@ except ImportError:
     subprocess.check_call([sys.executable, "-m", "pip", "install", "requests"])
     import requests
 
-def check_elasticsearch(host='localhost', port=9200, username=None, password=None):
+# Optional: orjson parses response bodies faster than the stdlib
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# One pooled keep-alive session for every check; GETs that fail while
+# Elasticsearch is still starting are retried with exponential backoff
+session = requests.Session()
+session.mount('http://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(total=5, backoff_factor=0.5, status_forcelist=[502, 503, 504],
+                      allowed_methods=["GET"])
+))
+
+# A successful check is remembered briefly so back-to-back runs (scripts, CI)
+# skip the HTTP round trips; the TCP check still runs to catch a crash
+CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'gov-doc-search', 'es_health.json')
+CACHE_TTL = 30
+
+def _cache_key(host, port, username):
+    # The password is left out entirely: a hash of a default password like
+    # 'elastic' or 'changeme' is as good as the plaintext
+    return f"{host}:{port}:{username or ''}"
+
+def _read_cache(key):
+    try:
+        with open(CACHE_PATH, 'rb') as f:
+            cached = json_loads(f.read())
+        if cached.get('key') == key and time.time() - cached.get('ts', 0) <= CACHE_TTL:
+            return cached
+    except (OSError, ValueError):
+        pass
+    return None
+
+def _write_cache(key, info, health):
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        # Write then rename, so concurrent runs never read a partial file
+        tmp_path = f"{CACHE_PATH}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'ts': time.time(), 'info': info, 'health': health}, f)
+        os.replace(tmp_path, CACHE_PATH)
+    except OSError:
+        pass
+
+def _print_running(info, health):
+    print("\n✓✓✓ Elasticsearch is running! ✓✓✓")
+    print(f"\n  Version: {info.get('version', {}).get('number', 'Unknown')}")
+    print(f"  Cluster: {health.get('cluster_name', 'Unknown')}")
+    print(f"  Health: {health.get('status', 'unknown')}")
+
+def _print_not_running():
+    print("\n✗ Cannot connect to Elasticsearch")
+    print("\n  Make sure Elasticsearch is started:")
+    print("    cd C:\\elasticsearch\\elasticsearch-8.17.4\\bin")
+    print("    .\\elasticsearch.bat")
+
+def port_open(host, port, timeout=1.0):
+    """Cheap TCP connect to the port; fails fast when nothing is listening."""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+def check_elasticsearch(host='localhost', port=9200, username=None, password=None, use_cache=True):
     """Check if Elasticsearch is running."""
     url = f'http://{host}:{port}'
     print(f"Checking Elasticsearch at {url}...")
     
+    # When the server is down, skip the HTTP probe and its retries and timeout
+    if not port_open(host, port):
+        _print_not_running()
+        return False
+    
+    key = _cache_key(host, port, username)
+    cached = _read_cache(key) if use_cache else None
+    if cached:
+        _print_running(cached['info'], cached['health'])
+        print(f"  (checked {time.time() - cached['ts']:.0f}s ago)")
+        return True
+    
     try:
         auth = None
         if username and password:
             auth = (username, password)
         
-        response = requests.get(url, auth=auth, timeout=10)
+        # Cluster health says whether shards are actually usable; GET / answers
+        # 200 during boot well before they are. wait_for_status returns as soon
+        # as the cluster is at least yellow, or with 408 after the timeout.
+        response = session.get(
+            f'{url}/_cluster/health',
+            params={'wait_for_status': 'yellow', 'timeout': '5s'},
+            auth=auth,
+            timeout=10
+        )
         
-        if response.status_code == 200:
-            info = response.json()
-            print("\n✓✓✓ Elasticsearch is running! ✓✓✓")
-            print(f"\n  Version: {info.get('version', {}).get('number', 'Unknown')}")
-            print(f"  Cluster: {info.get('cluster_name', 'Unknown')}")
-            print(f"  Status: {info.get('tagline', 'Unknown')}")
+        if response.status_code in (200, 408):
+            health = json_loads(response.content)
+            status = health.get('status', 'unknown')
+            if status == 'red' or response.status_code == 408:
+                print(f"\n✗ Elasticsearch is up but the cluster is not ready (status: {status})")
+                print("  Shards are still being allocated. Wait a bit and try again.")
+                return False
+            
+            # Version banner, on the same pooled connection
+            info = json_loads(session.get(url, auth=auth, timeout=10).content)
+            _print_running(info, health)
+            _write_cache(key, info, health)
             return True
         elif response.status_code == 401:
             print("\n✗ Authentication required")
@@ -39,11 +140,12 @@ def check_elasticsearch(host='localhost', port=9200, username=None, password=Non
         else:
             print(f"\n✗ Elasticsearch responded with status: {response.status_code}")
             return False
+    except requests.exceptions.RetryError:
+        print("\n✗ Elasticsearch kept responding with errors")
+        print("  It may still be starting up. Wait a bit and try again.")
+        return False
     except requests.exceptions.ConnectionError:
-        print("\n✗ Cannot connect to Elasticsearch")
-        print("\n  Make sure Elasticsearch is started:")
-        print("    cd C:\\elasticsearch\\elasticsearch-8.17.4\\bin")
-        print("    .\\elasticsearch.bat")
+        _print_not_running()
         return False
     except requests.exceptions.Timeout:
         print("\n✗ Connection timeout")
@@ -60,6 +162,8 @@ if __name__ == "__main__":
     parser.add_argument('--port', type=int, default=9200, help='Elasticsearch port')
     parser.add_argument('--username', help='Elasticsearch username')
     parser.add_argument('--password', help='Elasticsearch password')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always query the server, ignoring a result cached in the last 30s')
     
     args = parser.parse_args()
     
@@ -67,7 +171,8 @@ if __name__ == "__main__":
         host=args.host,
         port=args.port,
         username=args.username,
-        password=args.password
+        password=args.password,
+        use_cache=not args.no_cache
     )
     
     if is_running:
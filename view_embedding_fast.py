@@ -1,38 +1,117 @@
 #!/usr/bin/env python3
 """Fastest way to view embedding - uses search service that we know works!"""
 
+import argparse
 import sys, os
-sys.path.insert(0, 'src')
+from functools import lru_cache
+
+import numpy as np
+# Relative to this file, so the script runs from any directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
 
 from search.search_service import SearchService
-from search.es_setup import ElasticsearchSetup
-from embeddings.embedding_service import EmbeddingService
+from search.es_setup import get_shared_setup
+from embeddings.embedding_service import EmbeddingService, dequantize_embedding
+
+@lru_cache(maxsize=1)
+def get_services():
+    """Connect and load the model once per process (e.g. when imported from a notebook)."""
+    # The response carries a whole embedding vector; let it travel gzipped
+    es = get_shared_setup(http_compress=True)
+    emb_service = EmbeddingService()
+    return es, emb_service, SearchService(es, emb_service)
 
-# Connect
-es = ElasticsearchSetup()
-emb_service = EmbeddingService()
-search_service = SearchService(es, emb_service)
+def fmt(values):
+    """Format a slice of the vector in one numpy pass."""
+    return np.array2string(values, precision=6, separator=", ", max_line_width=120)
 
-# Get first document - do a search to get actual indexed document
-results = search_service.search("income tax", size=1)
+# Without --full, Elasticsearch returns just the ends of the vector and its
+# length, computed from the stored _source, instead of the whole array
+EMBEDDING_ENDS = {
+    "head": {"script": {"source": "params._source.embedding.subList(0, 20)"}},
+    "tail": {"script": {"source": "def v = params._source.embedding; v.subList(v.size() - 10, v.size())"}},
+    "dims": {"script": {"source": "params._source.embedding.size()"}},
+}
 
-if results:
+def _fetch_full(search_service, fields):
+    """Top hit with its whole vector, as a float32 array in result['vector']."""
+    # Searches leave the vector out by default; ask for the compact int8 copy
+    # (stored with process_and_index.py --store-quantized)
+    results = search_service.search("income tax", size=1,
+                                    source_includes=fields + ["embedding_q", "embedding_scale"])
+    if results and 'embedding_q' not in results[0]:
+        # Indexed without the int8 copy: fetch the float vector instead
+        results = search_service.search("income tax", size=1, source_includes=fields + ["embedding"])
+    if not results:
+        return None
     result = results[0]
-    embedding = result.get('embedding', [])
+    # One float32 array for all the printing; numpy formats it in one pass
+    if 'embedding_q' in result:
+        result['vector'] = dequantize_embedding(result['embedding_q'], result['embedding_scale'])
+    else:
+        result['vector'] = np.asarray(result.pop('embedding', []), dtype=np.float32)
+    return result
+
+def main():
+    """Print the embedding of the top chunk for a sample query."""
+    parser = argparse.ArgumentParser(description='View the embedding of the top chunk for "income tax"')
+    parser.add_argument('--full', action='store_true',
+                        help='Fetch and print the whole vector, not just its first 20 and last 10 values')
+    args = parser.parse_args()
+    
+    # Connect
+    _, _, search_service = get_services()
     
-    print("\n" + "="*60)
-    print("VECTOR EMBEDDING")
-    print("="*60)
-    print(f"Document ID: {result.get('doc_id', 'N/A')}")
-    print(f"Title: {result.get('title', 'N/A')}")
-    print(f"Chunk ID: {result.get('chunk_id', 'N/A')}")
-    print(f"Embedding Dimension: {len(embedding)}")
-    print(f"\nFirst 20 values:")
-    print(embedding[:20])
-    print(f"\nLast 10 values:")
-    print(embedding[-10:])
-    print(f"\nFull Vector (384 dimensions):")
-    print(embedding)
-else:
-    print("No documents found!")
+    # Get first document - do a search to get actual indexed document
+    fields = ["doc_id", "title", "chunk_id"]
+    result = None
+    if not args.full:
+        results = search_service.search("income tax", size=1, source_includes=fields,
+                                        script_fields=EMBEDDING_ENDS)
+        if results and 'fields' in results[0]:
+            result = results[0]
+            ends = result['fields']
+            head = np.asarray(ends['head'], dtype=np.float32)
+            tail = np.asarray(ends['tail'], dtype=np.float32)
+            dims = ends['dims'][0]
+    if result is None:
+        # --full, or the cluster could not run the scripts
+        result = _fetch_full(search_service, fields)
+        if result is not None:
+            embedding = result['vector']
+            head, tail, dims = embedding[:20], embedding[-10:], len(embedding)
+    
+    if result is not None:
+        # Whole report goes out in one write
+        lines = [
+            "\n" + "="*60,
+            "VECTOR EMBEDDING",
+            "="*60,
+            f"Document ID: {result.get('doc_id', 'N/A')}",
+            f"Title: {result.get('title', 'N/A')}",
+            f"Chunk ID: {result.get('chunk_id', 'N/A')}",
+            f"Embedding Dimension: {dims}",
+        ]
+        if 'embedding_q' in result:
+            lines.append("(Values decoded from the stored int8 copy)")
+        lines += [
+            "\nFirst 20 values:",
+            fmt(head),
+            "\nLast 10 values:",
+            fmt(tail),
+        ]
+        if 'vector' in result:
+            lines += [
+                f"\nFull Vector ({dims} dimensions):",
+                fmt(result['vector']),
+            ]
+        else:
+            lines.append("\n(Run with --full to print the whole vector)")
+        sys.stdout.write("\n".join(lines) + "\n")
+    else:
+        print("No documents found!")
+    
+
 
+if __name__ == "__main__":
+    main()